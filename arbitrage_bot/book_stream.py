@@ -0,0 +1,356 @@
+"""Streaming order books from the Polymarket CLOB market websocket."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+import websockets
+from loguru import logger
+
+from . import orderbook
+from .orderbook import ParsedBook
+
+
+def _to_int(value: object) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: object) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class L2Book:
+    """Price-level book for one token, kept in sync from snapshots and price-change deltas."""
+
+    __slots__ = ("bids", "asks", "timestamp", "hash", "synced", "updated_at", "snapshot_at", "pending", "_parsed")
+
+    def __init__(self) -> None:
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.timestamp: Optional[int] = None
+        self.hash: Optional[str] = None
+        self.synced = False
+        self.updated_at = 0.0
+        self.snapshot_at = 0.0
+        # Deltas received while a REST resync is in flight, replayed on top of the snapshot.
+        self.pending: Optional[List[dict]] = None
+        self._parsed: Optional[ParsedBook] = None
+
+    def apply_snapshot(self, raw: dict) -> None:
+        self.bids = self._levels(raw.get("bids", raw.get("buys")))
+        self.asks = self._levels(raw.get("asks", raw.get("sells")))
+        self.timestamp = _to_int(raw.get("timestamp"))
+        self.hash = raw.get("hash")
+        self.synced = True
+        self.updated_at = self.snapshot_at = time.time()
+        self._parsed = None
+
+    def apply_change(self, change: dict, timestamp: Optional[int]) -> None:
+        if timestamp is not None and self.timestamp is not None and timestamp < self.timestamp:
+            return
+        price = _to_float(change.get("price"))
+        size = _to_float(change.get("size"))
+        side = str(change.get("side") or "").upper()
+        if price is None or size is None or side not in {"BUY", "SELL"}:
+            return
+        levels = self.bids if side == "BUY" else self.asks
+        if size > 0:
+            levels[price] = size
+        else:
+            levels.pop(price, None)
+        if timestamp is not None:
+            self.timestamp = timestamp
+        self.hash = change.get("hash") or self.hash
+        self.updated_at = time.time()
+        self._parsed = None
+
+    def consistent_with(self, change: dict) -> bool:
+        """Compare our top of book with the best bid/ask the server reports after a delta."""
+        for key, levels, pick in (("best_bid", self.bids, max), ("best_ask", self.asks, min)):
+            reported = _to_float(change.get(key))
+            if reported is None:
+                continue
+            ours = pick(levels) if levels else None
+            # The server reports an empty side as 0 (bids) or 1 (asks).
+            if ours is None and reported in (0.0, 1.0):
+                continue
+            if ours is None or abs(ours - reported) > 1e-9:
+                return False
+        return True
+
+    def parsed(self) -> ParsedBook:
+        if self._parsed is None:
+            self._parsed = ParsedBook(
+                self.bids.items(),
+                self.asks.items(),
+                book_hash=self.hash,
+                timestamp=str(self.timestamp) if self.timestamp is not None else None,
+            )
+        return self._parsed
+
+    @staticmethod
+    def _levels(raw_levels: object) -> Dict[float, float]:
+        levels: Dict[float, float] = {}
+        if not isinstance(raw_levels, list):
+            return levels
+        for level in raw_levels:
+            if not isinstance(level, dict):
+                continue
+            price = _to_float(level.get("price"))
+            size = _to_float(level.get("size"))
+            if price is not None and size is not None and price > 0 and size > 0:
+                levels[price] = size
+        return levels
+
+
+class BookStream:
+    """Maintains L2 books for watched tokens from the CLOB ``market`` channel.
+
+    Books are served to ``orderbook.fetch_order_book`` without network I/O while the
+    connection is up. The channel has no sequence numbers, so a gap is inferred when a
+    delta arrives for a token without a snapshot or when the best bid/ask the server
+    reports after a delta disagrees with ours; the book is then withheld and resynced
+    from REST. Books are also re-snapshotted in the background every
+    ``resnapshot_sec`` to bound drift in deeper levels, and everything is dropped and
+    resubscribed on reconnect.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        heartbeat_sec: float = 10.0,
+        idle_unwatch_sec: float = 300.0,
+        resnapshot_sec: float = 60.0,
+        reconnect_delay_sec: float = 1.0,
+    ) -> None:
+        self.url = url
+        self.heartbeat_sec = heartbeat_sec
+        self.idle_unwatch_sec = idle_unwatch_sec
+        self.resnapshot_sec = resnapshot_sec
+        self.reconnect_delay_sec = reconnect_delay_sec
+        self.books: Dict[str, L2Book] = {}
+        self.connected = False
+        self._watched: Dict[str, float] = {}
+        self._subscribed: Set[str] = set()
+        self._subscription_changed = asyncio.Event()
+        self._resyncs: Dict[str, asyncio.Task] = {}
+        self.counters: Dict[str, int] = {
+            "connects": 0,
+            "messages": 0,
+            "snapshots": 0,
+            "deltas": 0,
+            "resyncs": 0,
+            "resnapshots": 0,
+            "served": 0,
+        }
+
+    # -- public API used by orderbook -------------------------------------------------
+
+    def watch(self, token_ids: Iterable[str]) -> None:
+        now = time.monotonic()
+        added = False
+        for token_id in token_ids:
+            if not token_id:
+                continue
+            if token_id not in self._watched:
+                added = True
+            self._watched[token_id] = now
+        if added:
+            self._subscription_changed.set()
+
+    def get(self, token_id: str) -> Optional[ParsedBook]:
+        if not self.connected:
+            return None
+        book = self.books.get(token_id)
+        if book is None or not book.synced:
+            return None
+        self._watched[token_id] = time.monotonic()
+        self.counters["served"] += 1
+        return book.parsed()
+
+    def age(self, token_id: str) -> Optional[float]:
+        book = self.books.get(token_id)
+        if book is None or not book.synced:
+            return None
+        return time.time() - book.updated_at
+
+    def version(self, token_id: str) -> Optional[tuple]:
+        """Changes whenever the served book is replaced or updated."""
+        book = self.books.get(token_id)
+        if not self.connected or book is None or not book.synced:
+            return None
+        return ("stream", book.hash, book.timestamp, book.updated_at)
+
+    def stats(self) -> dict:
+        return dict(
+            self.counters,
+            connected=self.connected,
+            watched=len(self._watched),
+            subscribed=len(self._subscribed),
+            synced_books=sum(1 for book in self.books.values() if book.synced),
+        )
+
+    # -- connection handling ---------------------------------------------------------
+
+    async def run(self) -> None:
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as websocket:
+                    await self._session(websocket)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("CLOB book stream disconnected: %s", exc)
+            finally:
+                self._reset()
+            await asyncio.sleep(self.reconnect_delay_sec)
+
+    def _reset(self) -> None:
+        self.connected = False
+        self._subscribed.clear()
+        self.books.clear()
+        for task in self._resyncs.values():
+            task.cancel()
+        self._resyncs.clear()
+
+    async def _session(self, websocket) -> None:
+        self.counters["connects"] += 1
+        self.connected = True
+        logger.info("CLOB book stream connected: %s", self.url)
+        maintainer = asyncio.create_task(self._maintain_subscription(websocket))
+        try:
+            async for message in websocket:
+                if message in ("PONG", b"PONG"):
+                    continue
+                try:
+                    payload = json.loads(message)
+                except ValueError:
+                    continue
+                self.handle_message(payload)
+        finally:
+            maintainer.cancel()
+
+    async def _maintain_subscription(self, websocket) -> None:
+        last_ping = time.monotonic()
+        while True:
+            self._drop_idle_tokens()
+            self._resnapshot_old_books()
+            wanted = set(self._watched)
+            added = wanted - self._subscribed
+            removed = self._subscribed - wanted
+            if added:
+                message = {"assets_ids": sorted(added), "type": "market"}
+                if self._subscribed:
+                    message = {"assets_ids": sorted(added), "operation": "subscribe"}
+                await websocket.send(json.dumps(message))
+                self._subscribed.update(added)
+            if removed:
+                await websocket.send(json.dumps({"assets_ids": sorted(removed), "operation": "unsubscribe"}))
+                self._subscribed.difference_update(removed)
+                for token_id in removed:
+                    self.books.pop(token_id, None)
+            if time.monotonic() - last_ping >= self.heartbeat_sec:
+                await websocket.send("PING")
+                last_ping = time.monotonic()
+            self._subscription_changed.clear()
+            try:
+                await asyncio.wait_for(self._subscription_changed.wait(), timeout=self.heartbeat_sec)
+            except asyncio.TimeoutError:
+                pass
+
+    def _resnapshot_old_books(self) -> None:
+        cutoff = time.time() - self.resnapshot_sec
+        for token_id, book in list(self.books.items()):
+            if book.synced and book.snapshot_at < cutoff and token_id not in self._resyncs:
+                self.counters["resnapshots"] += 1
+                self._start_resync(token_id, book)
+
+    def _drop_idle_tokens(self) -> None:
+        cutoff = time.monotonic() - self.idle_unwatch_sec
+        for token_id in [token_id for token_id, seen in self._watched.items() if seen < cutoff]:
+            del self._watched[token_id]
+
+    # -- message handling --------------------------------------------------------------
+
+    def handle_message(self, payload: object) -> None:
+        if isinstance(payload, list):
+            for item in payload:
+                self.handle_message(item)
+            return
+        if not isinstance(payload, dict):
+            return
+        self.counters["messages"] += 1
+        event_type = payload.get("event_type")
+        if event_type == "book":
+            self._on_snapshot(payload)
+        elif event_type == "price_change":
+            self._on_price_change(payload)
+
+    def _on_snapshot(self, payload: dict) -> None:
+        token_id = str(payload.get("asset_id") or "")
+        if not token_id:
+            return
+        self.counters["snapshots"] += 1
+        book = self.books.setdefault(token_id, L2Book())
+        book.apply_snapshot(payload)
+        task = self._resyncs.pop(token_id, None)
+        if task is not None:
+            task.cancel()
+        book.pending = None
+
+    def _on_price_change(self, payload: dict) -> None:
+        timestamp = _to_int(payload.get("timestamp"))
+        changes = payload.get("price_changes")
+        if not isinstance(changes, list):
+            # Older message layout: one asset per message with a ``changes`` list.
+            changes = [dict(change, asset_id=payload.get("asset_id")) for change in payload.get("changes") or []]
+        for change in changes:
+            if not isinstance(change, dict):
+                continue
+            token_id = str(change.get("asset_id") or "")
+            if not token_id:
+                continue
+            self.counters["deltas"] += 1
+            book = self.books.get(token_id)
+            if book is None or not book.synced:
+                book = self.books.setdefault(token_id, L2Book())
+                self._start_resync(token_id, book)
+            if book.pending is not None:
+                book.pending.append(dict(change, timestamp=timestamp))
+            book.apply_change(change, timestamp)
+            if book.synced and not book.consistent_with(change):
+                logger.debug("Book gap detected for %s; resyncing.", token_id)
+                book.synced = False
+                self._start_resync(token_id, book)
+
+    def _start_resync(self, token_id: str, book: L2Book) -> None:
+        if token_id in self._resyncs:
+            return
+        if not book.synced:
+            self.counters["resyncs"] += 1
+        book.pending = []
+        task = asyncio.get_running_loop().create_task(self._resync(token_id, book))
+        self._resyncs[token_id] = task
+
+    async def _resync(self, token_id: str, book: L2Book) -> None:
+        try:
+            raw = await orderbook.fetch_raw_book(token_id)
+            if raw is None or self.books.get(token_id) is not book:
+                return
+            pending = book.pending or []
+            book.apply_snapshot(raw)
+            for change in pending:
+                book.apply_change(change, change.get("timestamp"))
+        finally:
+            book.pending = None
+            if self._resyncs.get(token_id) is asyncio.current_task():
+                del self._resyncs[token_id]
@@ -77,6 +77,40 @@ class Settings:
     approval_mode: str = (os.getenv("APPROVAL_MODE", "cli") or "cli").lower()
     approval_web_host: str = os.getenv("APPROVAL_WEB_HOST", "127.0.0.1") or "127.0.0.1"
     approval_web_port: int = _int_env("APPROVAL_WEB_PORT", "8787")
+    clob_api_url: str = (os.getenv("CLOB_API_URL", "https://clob.polymarket.com") or "https://clob.polymarket.com").rstrip("/")
+    clob_ws_url: str = os.getenv("CLOB_WS_URL", "wss://ws-subscriptions-clob.polymarket.com/ws/market") or "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+    book_source: str = (os.getenv("BOOK_SOURCE", "poll") or "poll").lower()
+    book_stream_resnapshot_sec: float = _float_env("BOOK_STREAM_RESNAPSHOT_SEC", "60")
+    clob_http_timeout_sec: float = _float_env("CLOB_HTTP_TIMEOUT_SEC", "5")
+    clob_http_max_connections: int = _int_env("CLOB_HTTP_MAX_CONNECTIONS", "20")
+    clob_http_max_keepalive: int = _int_env("CLOB_HTTP_MAX_KEEPALIVE", "10")
+    clob_http_keepalive_expiry_sec: float = _float_env("CLOB_HTTP_KEEPALIVE_EXPIRY_SEC", "60")
+    clob_http2: bool = (os.getenv("CLOB_HTTP2", "false") or "false").lower() in {"1", "true", "yes"}
+    clob_books_batch_size: int = _int_env("CLOB_BOOKS_BATCH_SIZE", "50")
+    clob_fetch_concurrency: int = _int_env("CLOB_FETCH_CONCURRENCY", "8")
+    order_workers: int = _int_env("ORDER_WORKERS", "2")
+    orderbook_cache_max_entries: int = _int_env("ORDERBOOK_CACHE_MAX_ENTRIES", "2000")
+    orderbook_cache_retention_sec: float = _float_env("ORDERBOOK_CACHE_RETENTION_SEC", "30")
+    paper_book_max_age_sec: float = _float_env("PAPER_BOOK_MAX_AGE_SEC", "5")
+    hot_ratio_band: float = _float_env("HOT_RATIO_BAND", "0.05")
+    hot_token_hold_sec: float = _float_env("HOT_TOKEN_HOLD_SEC", "30")
+    book_refresh_interval_sec: float = _float_env("BOOK_REFRESH_INTERVAL_SEC", "0.5")
+    hot_book_max_age_sec: float = _float_env("HOT_BOOK_MAX_AGE_SEC", "5")
+    strategy_sweep_interval_sec: float = _float_env("STRATEGY_SWEEP_INTERVAL_SEC", "10")
+    depth_ratio_margin: float = _float_env("DEPTH_RATIO_MARGIN", "0.05")
+    strategy_reevaluate_max_age_sec: float = _float_env("STRATEGY_REEVALUATE_MAX_AGE_SEC", "30")
+    strategy_match_concurrency: int = _int_env("STRATEGY_MATCH_CONCURRENCY", "16")
+    strategy_match_deadline_sec: float = _float_env("STRATEGY_MATCH_DEADLINE_SEC", "0.5")
+    strategy_workers: int = _int_env("STRATEGY_WORKERS", "0")
+    strategy_shard_by: str = (os.getenv("STRATEGY_SHARD_BY", "match") or "match").lower()
+    odds_table_rows: int = _int_env("ODDS_TABLE_ROWS", "0")
+    odds_table_name: str = os.getenv("ODDS_TABLE_NAME", "") or ""
+    pinnacle_decoder: str = (os.getenv("PINNACLE_DECODER", "auto") or "auto").lower()
+    polymarket_series_per_shard: int = _int_env("POLYMARKET_SERIES_PER_SHARD", "1")
+    polymarket_page_limit: int = _int_env("POLYMARKET_PAGE_LIMIT", "500")
+    polymarket_poll_interval_sec: float = _float_env("POLYMARKET_POLL_INTERVAL_SEC", "5")
+    polymarket_fast_poll_interval_sec: float = _float_env("POLYMARKET_FAST_POLL_INTERVAL_SEC", "1")
+    polymarket_idle_poll_interval_sec: float = _float_env("POLYMARKET_IDLE_POLL_INTERVAL_SEC", "15")
 
 
 settings = Settings()
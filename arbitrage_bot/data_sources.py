@@ -2,41 +2,155 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+import hashlib
 import json
 import time
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
 import httpx
 from loguru import logger
 
 from . import config
 from .logging_utils import snapshot_json
+from .metrics import LatencyStats
+from .pinnacle_frames import DECODER_NAME, decode_frame
+from .records import MARKET_SOURCE_FIELDS, MarketCache, PinnacleMatch, PolymarketEvent
 from .state import BotState
 
 _PINNACLE_SNAPSHOT_PATH = config.DATA_SNAPSHOT_DIR / "pinnacle_data.json"
 _POLYMARKET_SNAPSHOT_PATH = config.DATA_SNAPSHOT_DIR / "polymarket_data.json"
 _SNAPSHOT_INTERVAL_SEC = 3
+# Safety stop for pagination in case the API keeps returning full pages.
+_POLYMARKET_MAX_PAGES = 20
+# Polymarket history kept for trade logs: the 120 s post-trade window plus a margin.
+_POLYMARKET_HISTORY_SEC = 180
 
 _pinnacle_snapshot_at = 0.0
 _polymarket_snapshot_at = 0.0
+_polymarket_snapshot_stale = False
+
+# Parsed markets shared by all shards; an event update re-parses only the markets that changed.
+POLYMARKET_MARKET_CACHE = MarketCache()
+
+# Bookkeeping fields that change on nearly every poll without affecting prices,
+# scores or market structure; left out of the event fingerprint. ``liquidityNum`` stays
+# in: it becomes ``PolymarketMarket.liquidity``, which the trade-time liquidity check reads.
+_VOLATILE_EVENT_KEYS = frozenset(
+    {
+        "updatedAt",
+        "volume",
+        "volumeNum",
+        "volumeClob",
+        "volume24hr",
+        "volume24hrClob",
+        "volume1wk",
+        "volume1mo",
+        "volume1yr",
+        "liquidity",
+        "liquidityClob",
+        "openInterest",
+        "competitive",
+        "commentCount",
+        "chats",
+    }
+)
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {key: _strip_volatile(item) for key, item in value.items() if key not in _VOLATILE_EVENT_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+
+def event_fingerprint(event: dict) -> str:
+    """Content hash of a Polymarket event over everything but volatile bookkeeping fields."""
+    payload = json.dumps(_strip_volatile(event), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def apply_polymarket_events(
+    state: BotState,
+    live_events: Dict[str, dict],
+    owned: Optional[Set[str]] = None,
+) -> Tuple[int, int, int, int]:
+    """Merge one poll into ``state.polymarket_data`` and notify the strategy of differences.
+
+    Unchanged events keep their stored object. When ``owned`` is given, only those ids
+    may be removed and the set is replaced by the ids of ``live_events``, so each poller
+    shard manages just its own events. Returns ``(added, updated, removed, unchanged)``.
+    """
+    added = updated = unchanged = 0
+    for event_id, event in live_events.items():
+        version = event_fingerprint(event)
+        previous = state.polymarket_data.get(event_id)
+        if previous is not None and previous.version == version:
+            unchanged += 1
+            continue
+        record = PolymarketEvent.from_raw(event, version, POLYMARKET_MARKET_CACHE)
+        state.polymarket_data[event_id] = record
+        if state.odds_table is not None:
+            for market in record.markets:
+                for token_id, price in zip(market.token_ids, market.prices):
+                    state.odds_table.write_polymarket(token_id, price)
+        if previous is None:
+            added += 1
+            state.mark_dirty("polymarket", event_id, "add")
+        else:
+            updated += 1
+            current = {market.market_id for market in record.markets}
+            POLYMARKET_MARKET_CACHE.discard(
+                market.market_id for market in previous.markets if market.market_id not in current
+            )
+            state.mark_dirty("polymarket", event_id, "update")
+    candidates = state.polymarket_data if owned is None else owned
+    removed_ids = [event_id for event_id in candidates if event_id not in live_events]
+    if owned is not None:
+        owned.clear()
+        owned.update(live_events)
+    removed = 0
+    for event_id in removed_ids:
+        record = state.polymarket_data.pop(event_id, None)
+        if record is None:
+            continue
+        POLYMARKET_MARKET_CACHE.discard(market.market_id for market in record.markets)
+        state.hot_events.pop(event_id, None)
+        state.mark_dirty("polymarket", event_id, "remove")
+        removed += 1
+    return added, updated, removed, unchanged
 
 
 def create_pinnacle_handler(state: BotState):
     async def handler(websocket):
         global _pinnacle_snapshot_at
-        logger.info("Pinnacle parser connected: %s", websocket.remote_address)
+        logger.info("Pinnacle parser connected: %s (decoder: %s)", websocket.remote_address, DECODER_NAME)
         try:
             async for message in websocket:
-                data = json.loads(message)
-                match_id = data.get("MatchId")
-                if not match_id or not data.get("homeName") or not data.get("awayName"):
+                try:
+                    data = decode_frame(message)
+                    if data is None:
+                        continue
+                    match = PinnacleMatch.from_frame(data)
+                except (KeyError, TypeError, ValueError) as exc:
+                    logger.warning("Skipping undecodable Pinnacle frame: %s", exc)
                     continue
-                data["match"] = f"{data['homeName']} vs {data['awayName']}"
-                state.pinnacle_data[match_id] = data
+                match_id = match.match_id
+                kind = "update" if match_id in state.pinnacle_data else "add"
+                state.pinnacle_data[match_id] = match
+                state.mark_dirty("pinnacle", match_id, kind)
+                if state.odds_table is not None:
+                    for odds in match.odds:
+                        state.odds_table.write_pinnacle(match_id, odds.name, odds.price)
 
                 now = time.time()
                 if now - _pinnacle_snapshot_at > _SNAPSHOT_INTERVAL_SEC:
-                    snapshot_json(state.pinnacle_data, _PINNACLE_SNAPSHOT_PATH)
+                    snapshot_json(
+                        {key: match.as_dict() for key, match in state.pinnacle_data.items()},
+                        _PINNACLE_SNAPSHOT_PATH,
+                    )
                     _pinnacle_snapshot_at = now
 
                 state.pinnacle_history.append({"timestamp": now, "source": "Pinnacle", "data": data})
@@ -47,53 +161,280 @@ def create_pinnacle_handler(state: BotState):
     return handler
 
 
-async def poll_polymarket_data(state: BotState) -> None:
-    global _polymarket_snapshot_at
-    params = [("series_id", sid) for sid in config.POLYMARKET_SERIES_IDS]
-    params.extend(
-        [
-            ("limit", "500"),
-            ("closed", "false"),
-            ("include_chat", "true"),
+# Event and market fields the strategy, logs and test mode read; everything else is
+# dropped as each event is parsed.
+_EVENT_FIELDS = ("id", "title", "slug", "score", "period", "elapsed", "live", "active", "closed", "ended")
+
+
+def lean_event(event: dict) -> dict:
+    """Copy of a Gamma event reduced to the fields the bot uses."""
+    lean = {key: event[key] for key in _EVENT_FIELDS if key in event}
+    lean["markets"] = [
+        {key: market[key] for key in MARKET_SOURCE_FIELDS if key in market}
+        for market in event.get("markets") or []
+        if isinstance(market, dict)
+    ]
+    series = event.get("series")
+    if isinstance(series, list):
+        lean["series"] = [
+            {"id": item.get("id"), "title": item.get("title")} for item in series if isinstance(item, dict)
         ]
-    )
+    return lean
+
+
+class _JsonArrayParser:
+    """Incremental parser for the items of a top-level JSON array of objects.
+
+    Text is buffered as a list of pieces. An item split across chunks is retried only once
+    the buffered tail has doubled, so a large item costs linear rather than quadratic time.
+    """
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._pieces: List[str] = []
+        self._pending = 0
+        self._retry_at = 0
+        self.opened = False
+        self.closed = False
+        self.peak = 0
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer) - self._pos + self._pending
+
+    def feed(self, text: str, final: bool = False) -> List[object]:
+        """Items completed by ``text``; parsing stops at the closing bracket."""
+        self._pieces.append(text)
+        self._pending += len(text)
+        self.peak = max(self.peak, self.buffered)
+        if self.closed or (not final and self.buffered < self._retry_at):
+            return []
+        buffer = self._buffer[self._pos :] + "".join(self._pieces)
+        self._pieces.clear()
+        self._pending = 0
+        self._retry_at = 0
+        pos = 0
+        items: List[object] = []
         while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not self.opened:
+                if buffer[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                self.opened = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                self.closed = True
+                break
             try:
-                response = await client.get(config.POLYMARKET_API_URL, params=params)
-                response.raise_for_status()
-                events = response.json()
-                live_events: Dict[str, dict] = {}
-                for event in events:
-                    is_live = (
-                        event.get("live") is True
-                        or event.get("score") not in (None, "", "0-0")
-                        or event.get("elapsed") not in (None, "")
-                    )
-                    if event.get("active") and not event.get("closed") and is_live:
-                        live_events[event["id"]] = event
+                item, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The item continues in a later chunk.
+                self._retry_at = 2 * (len(buffer) - pos)
+                break
+            items.append(item)
+        self._buffer, self._pos = buffer, pos
+        return items
 
-                state.polymarket_data.clear()
-                state.polymarket_data.update(live_events)
 
-                now = time.time()
-                if now - _polymarket_snapshot_at > _SNAPSHOT_INTERVAL_SEC:
-                    snapshot_json(state.polymarket_data, _POLYMARKET_SNAPSHOT_PATH)
-                    _polymarket_snapshot_at = now
+async def iter_json_array(chunks: AsyncIterator[bytes], stats: Dict[str, int]) -> AsyncIterator[object]:
+    """Yield the items of a top-level JSON array of objects as their bytes arrive.
 
-                if live_events:
-                    state.polymarket_history.append(
-                        {"timestamp": now, "source": "Polymarket", "data": live_events}
-                    )
-                logger.info(
-                    "Polymarket poll: %s events returned, %s live tracked.",
-                    len(events),
-                    len(live_events),
-                )
-            except httpx.HTTPStatusError as exc:
-                logger.error("Polymarket API status %s", exc.response.status_code)
-            except Exception as exc:
-                logger.error("Error polling Polymarket: %s", exc)
-
-            await asyncio.sleep(5)
+    Only the undecoded tail of the body is buffered. ``stats`` receives the decoded
+    byte count (``bytes``) and the largest buffer held (``peak_buffer_bytes``).
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    parser = _JsonArrayParser()
+    async for chunk in chunks:
+        stats["bytes"] = stats.get("bytes", 0) + len(chunk)
+        items = parser.feed(text.decode(chunk))
+        stats["peak_buffer_bytes"] = max(stats.get("peak_buffer_bytes", 0), parser.peak)
+        for item in items:
+            yield item
+        if parser.closed:
+            return
+    for item in parser.feed(text.decode(b"", final=True), final=True):
+        yield item
+    if not parser.closed:
+        raise ValueError("truncated JSON array")
+
+
+def is_live_event(event: dict) -> bool:
+    is_live = (
+        event.get("live") is True
+        or event.get("score") not in (None, "", "0-0")
+        or event.get("elapsed") not in (None, "")
+    )
+    return bool(event.get("active") and not event.get("closed") and is_live)
+
+
+@dataclass
+class PolymarketShard:
+    """A group of series polled together, with its own cadence and metrics."""
+
+    series_ids: Tuple[str, ...]
+    event_ids: Set[str] = field(default_factory=set)
+    latency: LatencyStats = field(default_factory=LatencyStats)
+    interval_sec: float = 0.0
+    polls: int = 0
+    pages: int = 0
+    returned: int = 0
+    payload_bytes: int = 0
+    payload_bytes_total: int = 0
+    wire_bytes: int = 0
+    peak_buffer_bytes: int = 0
+    truncated: bool = False
+
+    @property
+    def name(self) -> str:
+        return "+".join(self.series_ids)
+
+    def as_dict(self) -> dict:
+        return {
+            "polls": self.polls,
+            "interval_sec": self.interval_sec,
+            "pages": self.pages,
+            "returned": self.returned,
+            "live": len(self.event_ids),
+            "payload_bytes": self.payload_bytes,
+            "payload_bytes_total": self.payload_bytes_total,
+            "wire_bytes": self.wire_bytes,
+            "peak_buffer_bytes": self.peak_buffer_bytes,
+            "truncated": self.truncated,
+            "latency": self.latency.as_dict(),
+        }
+
+
+def build_polymarket_shards(series_ids: Sequence[str], per_shard: int) -> List[PolymarketShard]:
+    size = max(1, per_shard)
+    return [PolymarketShard(tuple(series_ids[i : i + size])) for i in range(0, len(series_ids), size)]
+
+
+def _shard_interval(state: BotState, shard: PolymarketShard) -> float:
+    """Poll near-arb series fast, series with live events normally and the rest rarely."""
+    settings = config.settings
+    now = time.monotonic()
+    if any(state.hot_events.get(event_id, 0.0) > now for event_id in shard.event_ids):
+        return settings.polymarket_fast_poll_interval_sec
+    if shard.event_ids:
+        return settings.polymarket_poll_interval_sec
+    return settings.polymarket_idle_poll_interval_sec
+
+
+async def _fetch_shard_events(client: httpx.AsyncClient, shard: PolymarketShard) -> Dict[str, dict]:
+    """Fetch every page of the shard's series and return its live events, already slimmed.
+
+    Pages are stream-parsed, so non-live events and unused fields never pile up in
+    memory. Pages, decoded and on-the-wire bytes and peak parse buffer are recorded on
+    the shard.
+    """
+    limit = max(1, config.settings.polymarket_page_limit)
+    base_params = [("series_id", sid) for sid in shard.series_ids]
+    base_params.extend([("limit", str(limit)), ("active", "true"), ("closed", "false")])
+    live_events: Dict[str, dict] = {}
+    parse_stats: Dict[str, int] = {}
+    pages = returned = wire_bytes = 0
+    shard.truncated = False
+    while True:
+        params = base_params + [("offset", str(pages * limit))]
+        page_items = 0
+        # httpx advertises and transparently decodes gzip/deflate (and br when available).
+        async with client.stream("GET", config.POLYMARKET_API_URL, params=params) as response:
+            response.raise_for_status()
+            async for event in iter_json_array(response.aiter_bytes(), parse_stats):
+                page_items += 1
+                if isinstance(event, dict) and is_live_event(event):
+                    live_events[event["id"]] = lean_event(event)
+            wire_bytes += response.num_bytes_downloaded
+        pages += 1
+        returned += page_items
+        if page_items < limit:
+            break
+        if pages >= _POLYMARKET_MAX_PAGES:
+            shard.truncated = True
+            logger.warning("Polymarket shard %s: stopped after %s full pages.", shard.name, pages)
+            break
+    shard.pages = pages
+    shard.returned = returned
+    shard.payload_bytes = parse_stats.get("bytes", 0)
+    shard.payload_bytes_total += shard.payload_bytes
+    shard.wire_bytes = wire_bytes
+    shard.peak_buffer_bytes = parse_stats.get("peak_buffer_bytes", 0)
+    return live_events
+
+
+def _record_poll(state: BotState, added: int, updated: int, removed: int, unchanged: int) -> None:
+    global _polymarket_snapshot_at, _polymarket_snapshot_stale
+    changed = added + updated + removed
+    stats = state.polymarket_poll_stats
+    stats.update(
+        polls=stats.get("polls", 0) + 1,
+        live=len(state.polymarket_data),
+        changed_total=stats.get("changed_total", 0) + changed,
+        unchanged_total=stats.get("unchanged_total", 0) + unchanged,
+        markets=POLYMARKET_MARKET_CACHE.stats(),
+    )
+    now = time.time()
+    _polymarket_snapshot_stale = _polymarket_snapshot_stale or bool(changed)
+    if _polymarket_snapshot_stale and now - _polymarket_snapshot_at > _SNAPSHOT_INTERVAL_SEC:
+        snapshot_json({key: event.as_dict() for key, event in state.polymarket_data.items()}, _POLYMARKET_SNAPSHOT_PATH)
+        _polymarket_snapshot_at = now
+        _polymarket_snapshot_stale = False
+
+
+def _append_polymarket_history(state: BotState, live_events: Dict[str, dict]) -> None:
+    now = time.time()
+    history = state.polymarket_history
+    history.append({"timestamp": now, "source": "Polymarket", "data": live_events})
+    while history and history[0]["timestamp"] < now - _POLYMARKET_HISTORY_SEC:
+        history.popleft()
+
+
+async def _poll_shard(state: BotState, client: httpx.AsyncClient, shard: PolymarketShard) -> None:
+    shard_stats = state.polymarket_poll_stats.setdefault("shards", {})
+    while True:
+        started = time.perf_counter()
+        try:
+            live_events = await _fetch_shard_events(client, shard)
+            shard.latency.observe(time.perf_counter() - started)
+
+            added, updated, removed, unchanged = apply_polymarket_events(state, live_events, shard.event_ids)
+            shard.polls += 1
+            _record_poll(state, added, updated, removed, unchanged)
+
+            if live_events and (added or updated or removed):
+                _append_polymarket_history(state, live_events)
+            logger.debug(
+                "Polymarket shard %s: %s events returned, %s live (%s added, %s updated, %s removed, %s unchanged).",
+                shard.name,
+                shard.returned,
+                len(live_events),
+                added,
+                updated,
+                removed,
+                unchanged,
+            )
+        except httpx.HTTPStatusError as exc:
+            shard.latency.errors += 1
+            logger.error("Polymarket API status %s for series %s", exc.response.status_code, shard.name)
+        except Exception as exc:
+            shard.latency.errors += 1
+            logger.error("Error polling Polymarket series %s: %s", shard.name, exc)
+
+        shard.interval_sec = _shard_interval(state, shard)
+        shard_stats[shard.name] = shard.as_dict()
+        await asyncio.sleep(shard.interval_sec)
+
+
+async def poll_polymarket_data(state: BotState) -> None:
+    """Poll every series shard concurrently, each at its own cadence."""
+    shards = build_polymarket_shards(config.POLYMARKET_SERIES_IDS, config.settings.polymarket_series_per_shard)
+    limits = httpx.Limits(max_connections=max(len(shards), 1), max_keepalive_connections=max(len(shards), 1))
+    async with httpx.AsyncClient(timeout=10.0, limits=limits) as client:
+        logger.info("Polling Polymarket in %s shards.", len(shards))
+        await asyncio.gather(*(_poll_shard(state, client, shard) for shard in shards))
@@ -19,31 +19,41 @@ def configure_logging(level: str) -> None:
     logger.add(sys.stderr, level=level.upper())
 
 
+OPPORTUNITY_LOG_COLUMNS = [
+    "timestamp_utc",
+    "mkey",
+    "oKey",
+    "o_pin",
+    "p_yes",
+    "o_pm",
+    "ratio",
+    "edge_pct",
+    "liquidity",
+    "trigger_type",
+    "reason",
+    "pm_market_id",
+    "token_id",
+    "avail_shares_at_th",
+    "avail_usd_at_th",
+    "wavg_price_at_th",
+    "book_age_ms",
+]
+
+
 def ensure_opportunity_log_headers() -> None:
     path = config.OPPORTUNITY_LOG_FILE
-    if not path.exists():
-        with path.open("w", newline="") as handle:
-            writer = csv.writer(handle)
-            writer.writerow(
-                [
-                    "timestamp_utc",
-                    "mkey",
-                    "oKey",
-                    "o_pin",
-                    "p_yes",
-                    "o_pm",
-                    "ratio",
-                    "edge_pct",
-                    "liquidity",
-                    "trigger_type",
-                    "reason",
-                    "pm_market_id",
-                    "token_id",
-                    "avail_shares_at_th",
-                    "avail_usd_at_th",
-                    "wavg_price_at_th",
-                ]
-            )
+    if path.exists():
+        with path.open("r", newline="") as handle:
+            header = next(csv.reader(handle), None)
+        if header == OPPORTUNITY_LOG_COLUMNS:
+            return
+        # Older layout: keep it aside instead of appending misaligned rows.
+        legacy = path.with_name(f"{path.stem}.{int(time.time())}{path.suffix}")
+        path.rename(legacy)
+        logger.info("Opportunity log columns changed; previous log moved to %s", legacy)
+    with path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(OPPORTUNITY_LOG_COLUMNS)
 
 
 def ensure_paper_trades_log_headers() -> None:
@@ -89,6 +99,7 @@ def log_opportunity_change(
     avail_shares_at_th: Optional[float] = None,
     avail_usd_at_th: Optional[float] = None,
     wavg_price_at_th: Optional[float] = None,
+    book_age_ms: Optional[float] = None,
 ) -> None:
     """Log changes to the opportunity CSV with rate limiting on updates."""
     key = (mkey, okey)
@@ -140,6 +151,7 @@ def log_opportunity_change(
                 f"{avail_shares_at_th:.4f}" if avail_shares_at_th is not None else "",
                 f"{avail_usd_at_th:.2f}" if avail_usd_at_th is not None else "",
                 f"{wavg_price_at_th:.4f}" if wavg_price_at_th is not None else "",
+                f"{book_age_ms:.0f}" if book_age_ms is not None else "",
             ]
         )
     _last_opportunity_state[key] = {"ratio": ratio, "o_pin": o_pin, "p_yes": p_yes}
@@ -8,26 +8,30 @@ import websockets
 from loguru import logger
 
 try:
-    from . import config, data_sources, strategy, approvals, matching, webui
+    from . import config, data_sources, strategy, approvals, matching, orderbook, sharding, webui
+    from .book_stream import BookStream
+    from .odds_table import OddsTable
     from .logging_utils import (
         configure_logging,
         ensure_opportunity_log_headers,
         ensure_paper_trades_log_headers,
     )
     from .state import BotState
-    from .trading import paper_sell_strategy
+    from .trading import close_order_executor, paper_sell_strategy
 except ImportError:  # pragma: no cover - fallback for "python arbitrage_bot/main.py"
     ROOT = pathlib.Path(__file__).resolve().parent.parent
     if str(ROOT) not in sys.path:
         sys.path.append(str(ROOT))
-    from arbitrage_bot import config, data_sources, strategy, approvals, matching, webui
+    from arbitrage_bot import config, data_sources, strategy, approvals, matching, orderbook, sharding, webui
+    from arbitrage_bot.book_stream import BookStream
+    from arbitrage_bot.odds_table import OddsTable
     from arbitrage_bot.logging_utils import (
         configure_logging,
         ensure_opportunity_log_headers,
         ensure_paper_trades_log_headers,
     )
     from arbitrage_bot.state import BotState
-    from arbitrage_bot.trading import paper_sell_strategy
+    from arbitrage_bot.trading import close_order_executor, paper_sell_strategy
 
 
 async def main() -> None:
@@ -36,6 +40,9 @@ async def main() -> None:
     ensure_paper_trades_log_headers()
 
     state = BotState()
+    if config.settings.odds_table_rows > 0:
+        state.odds_table = OddsTable.create(config.settings.odds_table_rows, config.settings.odds_table_name)
+        logger.info("Odds table in shared memory '%s' (%s rows).", state.odds_table.name, state.odds_table.capacity)
     approval_mode = config.settings.approval_mode
     if approval_mode not in {"cli", "web", "both"}:
         logger.warning("Unknown APPROVAL_MODE '%s', falling back to 'cli'.", approval_mode)
@@ -55,10 +62,15 @@ async def main() -> None:
     pinnacle_handler = data_sources.create_pinnacle_handler(state)
     server = await websockets.serve(pinnacle_handler, "localhost", port)
 
+    if config.settings.strategy_workers > 0:
+        strategy_task = sharding.run_sharded_strategy(state)
+    else:
+        strategy_task = strategy.run_strategy(state)
     tasks = {
-        asyncio.create_task(strategy.run_strategy(state)),
+        asyncio.create_task(strategy_task),
         asyncio.create_task(data_sources.poll_polymarket_data(state)),
         asyncio.create_task(approvals.bootstrap_pending_queue(state)),
+        asyncio.create_task(orderbook.run_book_refresher(state)),
     }
     if approval_mode in {"cli", "both"}:
         tasks.add(asyncio.create_task(approvals.approval_prompt_loop(state)))
@@ -72,6 +84,14 @@ async def main() -> None:
                 )
             )
         )
+    if config.settings.book_source == "stream":
+        book_stream = BookStream(
+            config.settings.clob_ws_url,
+            resnapshot_sec=config.settings.book_stream_resnapshot_sec,
+        )
+        orderbook.attach_book_source(book_stream)
+        tasks.add(asyncio.create_task(book_stream.run()))
+        logger.info("Order books streamed from %s", config.settings.clob_ws_url)
     if config.settings.sell_mode in {"paper", "both"}:
         tasks.add(asyncio.create_task(paper_sell_strategy(state)))
 
@@ -82,6 +102,10 @@ async def main() -> None:
     finally:
         server.close()
         await server.wait_closed()
+        await orderbook.close_http_client()
+        await asyncio.to_thread(close_order_executor)
+        if state.odds_table is not None:
+            state.odds_table.close()
         if state.background_tasks:
             logger.warning("Waiting for %s log tasks to finish...", len(state.background_tasks))
             await asyncio.gather(*state.background_tasks, return_exceptions=True)
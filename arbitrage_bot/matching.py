@@ -1,17 +1,27 @@
 """Helpers for event matching and manual confirmation."""
 from __future__ import annotations
 
+import bisect
 import csv
+import functools
 import json
 import time
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Dict, Iterable, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 from loguru import logger
-from thefuzz import fuzz
+from rapidfuzz import fuzz, process
+from thefuzz.utils import full_process
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
 
 from . import config
+from .records import PolymarketEvent
 
 
 @dataclass
@@ -226,45 +236,233 @@ class MatchApprover:
         )
 
 
+# Titles repeat every tick; both helpers are pure, so their results are memoized.
+_TITLE_CACHE_SIZE = 8192
+
+
+@functools.lru_cache(maxsize=_TITLE_CACHE_SIZE)
 def normalize_title(title: Optional[str]) -> str:
     if not title:
         return ""
     return " ".join(title.lower().split())
 
 
+@functools.lru_cache(maxsize=_TITLE_CACHE_SIZE)
+def score_key(title: Optional[str]) -> str:
+    """Title as ``thefuzz.fuzz.token_sort_ratio`` compares it: normalized, ASCII, tokens sorted.
+
+    ``fuzz.ratio`` of two keys equals thefuzz's ``token_sort_ratio`` of the titles before rounding.
+    """
+    return " ".join(sorted(full_process(normalize_title(title), force_ascii=True).split()))
+
+
+def best_matches(keys: Sequence[str], others: Sequence[str]) -> List[Tuple[Optional[int], int]]:
+    """For each key, the position and score of the first best-scoring ``score_key`` in ``others``.
+
+    Scores equal thefuzz's, including rounding half to even (rapidfuzz's integer dtypes
+    round halves up, so scores are computed as floats). With numpy installed the whole
+    batch is one rapidfuzz ``cdist`` call; a position is ``None`` when nothing scores above 0.
+    """
+    if np is None or not keys or not others:
+        results = []
+        for key in keys:
+            best_index, best_score = None, 0
+            for index, other in enumerate(others):
+                score = int(round(fuzz.ratio(key, other)))
+                if score > best_score:
+                    best_index, best_score = index, score
+            results.append((best_index, best_score))
+        return results
+    matrix = np.rint(process.cdist(keys, others, scorer=fuzz.ratio, dtype=np.float64))
+    positions = matrix.argmax(axis=1)
+    scores = matrix[np.arange(len(keys)), positions].astype(int)
+    return [(int(index) if score > 0 else None, int(score)) for index, score in zip(positions, scores)]
+
+
 def find_matching_polymarket_event(
     pinnacle_event_title: str,
-    polymarket_events: Iterable[dict],
+    polymarket_events: Iterable[PolymarketEvent],
     score_threshold: int = 70,
-) -> Tuple[Optional[dict], int]:
+) -> Tuple[Optional[PolymarketEvent], int]:
     """Return best matching Polymarket event for the Pinnacle title."""
     if not pinnacle_event_title:
         return None, 0
 
-    best_score = 0
-    best_event: Optional[dict] = None
-    normalized_pin = normalize_title(pinnacle_event_title)
-
-    for event in polymarket_events:
-        pm_title = event.get("title")
-        if not pm_title:
-            continue
-        score = fuzz.token_sort_ratio(normalized_pin, normalize_title(pm_title))
-        if score > best_score:
-            best_score = score
-            best_event = event
-
-    if best_score >= score_threshold:
-        return best_event, best_score
+    events = [event for event in polymarket_events if event.title]
+    [(best_index, best_score)] = best_matches([score_key(pinnacle_event_title)], [score_key(event.title) for event in events])
+
+    if best_index is not None and best_score >= score_threshold:
+        return events[best_index], best_score
     return None, best_score
 
 
+@dataclass
+class _IndexEntry:
+    pin_title: str
+    key: str
+    event_id: Optional[str]
+    event_title: Optional[str]
+    score: int
+    generation: int
+
+
+class MatchIndex:
+    """Best Polymarket candidate per Pinnacle MatchId, kept across strategy ticks.
+
+    An entry stays valid while the Pinnacle title and its candidate's title are
+    unchanged; Polymarket events added or retitled since the entry was last used are
+    scored incrementally. A full search happens only for new or retitled matches and
+    when the candidate event disappears or is retitled; ``resolve`` scores all such
+    matches against all events as one matrix. The index also tracks which matches are
+    currently confirmed against which event.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, _IndexEntry] = {}
+        # Polymarket event id -> (title, score key, position). Dict order breaks score
+        # ties; the position (kept on retitle) lets incremental scoring follow it too.
+        self._titles: Dict[str, Tuple[str, str, int]] = {}
+        self._positions = 0
+        # (generation, event id) for every add/retitle, in ascending generation order.
+        self._changes: List[Tuple[int, str]] = []
+        self._generation = 0
+        self._pairs: Dict[str, Set[str]] = defaultdict(set)
+        self._pair_of: Dict[str, str] = {}
+        self.comparisons = 0
+        self.full_scans = 0
+
+    # -- Polymarket side ---------------------------------------------------------------
+
+    def observe_event(self, event_id: str, event: Optional[PolymarketEvent]) -> bool:
+        """Record an added, updated or removed event; True when its title appeared or changed."""
+        known = self._titles.get(event_id)
+        if event is None:
+            if known is not None:
+                del self._titles[event_id]
+            return False
+        if known is not None and known[0] == event.title:
+            return False
+        self._generation += 1
+        if known is None:
+            self._positions += 1
+            position = self._positions
+        else:
+            position = known[2]
+        self._titles[event_id] = (event.title, score_key(event.title), position)
+        self._changes.append((self._generation, event_id))
+        return True
+
+    def sync(self, events: Mapping[str, PolymarketEvent]) -> bool:
+        """Reconcile with the full event map; True when any title appeared or changed."""
+        for event_id in [event_id for event_id in self._titles if event_id not in events]:
+            self.observe_event(event_id, None)
+        changed = False
+        for event_id, event in events.items():
+            changed = self.observe_event(event_id, event) or changed
+        return changed
+
+    # -- Pinnacle side -----------------------------------------------------------------
+
+    def resolve(self, titles: Mapping[str, str]) -> None:
+        """Score every match (``match_id -> title``) without a valid entry, as one batch."""
+        pending = []
+        for match_id, pin_title in titles.items():
+            entry = self._entries.get(match_id)
+            if entry is None or entry.pin_title != pin_title or not self._candidate_valid(entry):
+                pending.append((match_id, pin_title, score_key(pin_title)))
+        if not pending:
+            return
+        self.full_scans += len(pending)
+        event_ids = list(self._titles)
+        results = best_matches([key for _, _, key in pending], [self._titles[event_id][1] for event_id in event_ids])
+        self.comparisons += len(pending) * len(event_ids)
+        for (match_id, pin_title, key), (best_index, best_score) in zip(pending, results):
+            event_id = event_ids[best_index] if best_index is not None else None
+            event_title = self._titles[event_id][0] if event_id is not None else None
+            self._entries[match_id] = _IndexEntry(pin_title, key, event_id, event_title, best_score, self._generation)
+
+    def best_candidate(self, match_id: str, pin_title: str) -> Tuple[Optional[str], int]:
+        """Return ``(event_id, score)`` of the best-scoring event title for this match."""
+        self.resolve({match_id: pin_title})
+        entry = self._entries[match_id]
+        start = bisect.bisect_right(self._changes, (entry.generation, "\uffff"))
+        # In event order, so ties resolve to the event a full scan would pick: the first.
+        changed = sorted(
+            {event_id for _, event_id in self._changes[start:] if event_id in self._titles},
+            key=lambda event_id: self._titles[event_id][2],
+        )
+        if changed:
+            [(best_index, best_score)] = best_matches([entry.key], [self._titles[event_id][1] for event_id in changed])
+            self.comparisons += len(changed)
+            if best_index is not None and (
+                best_score > entry.score
+                or (best_score == entry.score and self._titles[changed[best_index]][2] < self._titles[entry.event_id][2])
+            ):
+                event_id = changed[best_index]
+                entry.event_id, entry.event_title, entry.score = event_id, self._titles[event_id][0], best_score
+        entry.generation = self._generation
+        return entry.event_id, entry.score
+
+    def _candidate_valid(self, entry: _IndexEntry) -> bool:
+        if entry.event_id is None:
+            return True
+        known = self._titles.get(entry.event_id)
+        return known is not None and known[0] == entry.event_title
+
+    def pair(self, match_id: str, event_id: str) -> bool:
+        """Mark a confirmed pair; True when it is new."""
+        previous = self._pair_of.get(match_id)
+        if previous == event_id:
+            return False
+        self.unpair(match_id)
+        self._pair_of[match_id] = event_id
+        self._pairs[event_id].add(match_id)
+        return True
+
+    def unpair(self, match_id: str) -> None:
+        event_id = self._pair_of.pop(match_id, None)
+        if event_id is None:
+            return
+        matches = self._pairs.get(event_id)
+        if matches is not None:
+            matches.discard(match_id)
+            if not matches:
+                del self._pairs[event_id]
+
+    def matches_for(self, event_id: str) -> Set[str]:
+        return set(self._pairs.get(event_id, ()))
+
+    def is_paired(self, match_id: str) -> bool:
+        return match_id in self._pair_of
+
+    def prune(self, match_ids: Iterable[str]) -> None:
+        """Forget matches no longer tracked and drop change records every entry has seen."""
+        alive = set(match_ids)
+        for match_id in [match_id for match_id in self._entries if match_id not in alive]:
+            del self._entries[match_id]
+            self.unpair(match_id)
+        floor = min((entry.generation for entry in self._entries.values()), default=self._generation)
+        del self._changes[: bisect.bisect_right(self._changes, (floor, "\uffff"))]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "events": len(self._titles),
+            "pairs": len(self._pair_of),
+            "comparisons": self.comparisons,
+            "full_scans": self.full_scans,
+        }
+
+
 match_approver = MatchApprover(config.MATCH_APPROVED_FILE, config.MATCH_PENDING_FILE)
+match_index = MatchIndex()
 
 __all__ = [
     "MatchApprover",
     "MatchCandidate",
+    "MatchIndex",
     "match_approver",
+    "match_index",
     "find_matching_polymarket_event",
     "normalize_title",
 ]
@@ -0,0 +1,40 @@
+"""Lightweight in-process latency summaries for the bot's hot paths."""
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyStats:
+    """Running latency summary with percentiles over a bounded recent window."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        elapsed_ms = seconds * 1000.0
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self._recent.append(elapsed_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": (self.total_ms / self.count) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms if self.count else None,
+        }
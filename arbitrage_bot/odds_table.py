@@ -0,0 +1,374 @@
+"""Shared-memory table of live odds: one fixed-width row per (Pinnacle match, outcome).
+
+Lets a process other than ingestion (a strategy worker, a monitor such as
+``tools/watch_odds_table.py``) read current prices in place instead of receiving
+records over a pipe: it attaches to the segment by name. Only outcomes of confirmed
+pairs are published: the strategy allocates a row the first time it evaluates one and
+releases the match's rows when its pair goes away; released rows are reused. Each row
+holds four groups, each updated independently and carrying its own sequence number:
+
+* key: ``match_id`` and outcome, empty while the row is free;
+* Pinnacle: ``o_pin``, written per evaluation and by ``data_sources.create_pinnacle_handler``;
+* Polymarket: the bound CLOB ``token_id`` and its ``p_yes``, written per evaluation and
+  by ``apply_polymarket_events``;
+* book: best ask and ask depth (USD) up to the threshold price, written per evaluation.
+
+A group's sequence number is odd while the group is written (seqlock): readers retry
+while it is odd or changed under them, so they never see a half-written group and never
+take a lock. A reader re-checks the key group after reading a row, so a row released or
+reused meanwhile is never reported under the old key. Every write happens on the main
+process's event loop (strategy workers forward theirs), so each group has a single writer.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import multiprocessing
+import struct
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from loguru import logger
+
+_MAGIC = b"ODDT"
+_LAYOUT_VERSION = 2
+# magic, layout version, capacity, rows ever allocated; padded to one cache line.
+_HEADER = struct.Struct("<4sIII")
+_HEADER_SIZE = 64
+_KEY_SIZE = 64
+_TOKEN_SIZE = 80
+
+_SEQ = struct.Struct("<Q")
+_KEY = struct.Struct(f"<{_KEY_SIZE}s")
+_PIN = struct.Struct("<d")
+_PM = struct.Struct(f"<d{_TOKEN_SIZE}s")
+_BOOK = struct.Struct("<dd")
+# Row: key seq, key | pin seq, o_pin | pm seq, p_yes, token | book seq, best ask, depth.
+_KEY_OFFSET = 0
+_PIN_OFFSET = _KEY_OFFSET + _SEQ.size + _KEY.size
+_PM_OFFSET = _PIN_OFFSET + _SEQ.size + _PIN.size
+_BOOK_OFFSET = _PM_OFFSET + _SEQ.size + _PM.size
+ROW_SIZE = _BOOK_OFFSET + _SEQ.size + _BOOK.size
+
+# Segments created by this process.
+_OWNED: Set[str] = set()
+
+
+def row_key(match_id: str, outcome: str) -> bytes:
+    key = f"{match_id}\x1f{outcome}".encode()
+    if len(key) > _KEY_SIZE:
+        key = b"#" + hashlib.blake2b(key, digest_size=24).hexdigest().encode()
+    return key
+
+
+def _float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def _nan(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
+
+
+@dataclass(frozen=True, slots=True)
+class OddsRow:
+    """Consistent copy of one row; each ``*_seq`` counts that group's updates (twice per write)."""
+
+    o_pin: Optional[float]
+    pin_seq: int
+    p_yes: Optional[float]
+    token_id: Optional[str]
+    pm_seq: int
+    best_ask: Optional[float]
+    depth_usd: Optional[float]
+    book_seq: int
+
+
+class OddsTable:
+    """Fixed-width odds rows in a named ``SharedMemory`` segment.
+
+    ``create`` makes the writable owner in the main process; ``attach`` maps an existing
+    segment for reading from another process.
+    """
+
+    def __init__(self, segment: shared_memory.SharedMemory, owner: bool) -> None:
+        self._segment = segment
+        self._buf = segment.buf
+        self.owner = owner
+        magic, version, self.capacity, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC or version != _LAYOUT_VERSION:
+            raise ValueError(f"{segment.name} is not an odds table (layout {version})")
+        # Writer: match id -> outcome -> row, free rows, token bindings.
+        self._match_rows: Dict[str, Dict[str, int]] = {}
+        self._free: List[int] = []
+        self._allocated = 0
+        self._token_rows: Dict[str, Set[int]] = {}
+        self._row_tokens: Dict[int, str] = {}
+        self._full_logged = False
+        # Reader: key -> row, refreshed when a key is missing or its row was reused.
+        self._rows: Dict[bytes, int] = {}
+        self.writes = 0
+        self.released = 0
+        self.dropped = 0
+        self.retries = 0
+
+    @classmethod
+    def create(cls, capacity: int, name: Optional[str] = None) -> "OddsTable":
+        # A new segment is zero-filled: every sequence number starts even, every key empty.
+        segment = shared_memory.SharedMemory(name=name or None, create=True, size=_HEADER_SIZE + capacity * ROW_SIZE)
+        _HEADER.pack_into(segment.buf, 0, _MAGIC, _LAYOUT_VERSION, capacity, 0)
+        for row in range(capacity):
+            cls._pack_empty(segment.buf, _HEADER_SIZE + row * ROW_SIZE)
+        _OWNED.add(segment.name)
+        return cls(segment, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "OddsTable":
+        segment = shared_memory.SharedMemory(name=name)
+        # Before 3.13 attaching registers the segment with the resource tracker. The owner's
+        # process and its ``multiprocessing`` children share the tracker that already knows
+        # it; any other reader has its own, which would unlink the segment on exit.
+        if segment.name not in _OWNED and multiprocessing.parent_process() is None:
+            resource_tracker.unregister(segment._name, "shared_memory")  # type: ignore[attr-defined]
+        return cls(segment, owner=False)
+
+    @staticmethod
+    def _pack_empty(buf, base: int) -> None:
+        _PIN.pack_into(buf, base + _PIN_OFFSET + _SEQ.size, math.nan)
+        _PM.pack_into(buf, base + _PM_OFFSET + _SEQ.size, math.nan, b"")
+        _BOOK.pack_into(buf, base + _BOOK_OFFSET + _SEQ.size, math.nan, math.nan)
+
+    @property
+    def name(self) -> str:
+        return self._segment.name
+
+    def _high_water(self) -> int:
+        return _HEADER.unpack_from(self._buf, 0)[3]
+
+    def __len__(self) -> int:
+        """Rows in use (writer side)."""
+        return self._allocated - len(self._free)
+
+    def close(self) -> None:
+        self._buf = None
+        self._segment.close()
+        if self.owner:
+            _OWNED.discard(self._segment.name)
+            self._segment.unlink()
+
+    # -- writer (main process) ---------------------------------------------------------
+
+    def _write_group(self, offset: int, layout: struct.Struct, *values) -> None:
+        buf = self._buf
+        seq = _SEQ.unpack_from(buf, offset)[0]
+        _SEQ.pack_into(buf, offset, seq + 1)
+        layout.pack_into(buf, offset + 8, *values)
+        _SEQ.pack_into(buf, offset, seq + 2)
+        self.writes += 1
+
+    def _allocate(self, match_id: str, outcome: str) -> Optional[int]:
+        if self._free:
+            row = self._free.pop()
+        elif self._allocated < self.capacity:
+            row = self._allocated
+            self._allocated += 1
+        else:
+            self.dropped += 1
+            if not self._full_logged:
+                logger.warning("Odds table %s is full (%s rows); new outcomes are not published.", self.name, self.capacity)
+                self._full_logged = True
+            return None
+        self._write_group(_HEADER_SIZE + row * ROW_SIZE + _KEY_OFFSET, _KEY, row_key(match_id, outcome))
+        if row + 1 > self._high_water():
+            # Publish the row only after its key is in place.
+            _HEADER.pack_into(self._buf, 0, _MAGIC, _LAYOUT_VERSION, self.capacity, row + 1)
+        self._match_rows.setdefault(match_id, {})[outcome] = row
+        return row
+
+    def _bind(self, row: int, token_id: Optional[str]) -> None:
+        previous = self._row_tokens.get(row)
+        if previous == token_id:
+            return
+        if previous is not None:
+            rows = self._token_rows[previous]
+            rows.discard(row)
+            if not rows:
+                del self._token_rows[previous]
+        if token_id:
+            self._token_rows.setdefault(token_id, set()).add(row)
+            self._row_tokens[row] = token_id
+        else:
+            self._row_tokens.pop(row, None)
+
+    def write_pinnacle(self, match_id: str, outcome: str, o_pin: Optional[float]) -> None:
+        """Update ``o_pin`` of a published outcome; outcomes without a row are ignored."""
+        row = self._match_rows.get(match_id, {}).get(outcome)
+        if row is not None:
+            self._write_group(_HEADER_SIZE + row * ROW_SIZE + _PIN_OFFSET, _PIN, _nan(o_pin))
+
+    def write_polymarket(self, token_id: str, p_yes: Optional[float]) -> None:
+        """Update ``p_yes`` in every row bound to ``token_id``; unbound tokens are ignored."""
+        for row in self._token_rows.get(token_id, ()):
+            self._write_group(_HEADER_SIZE + row * ROW_SIZE + _PM_OFFSET, _PM, _nan(p_yes), token_id.encode())
+
+    def write_evaluation(
+        self,
+        match_id: str,
+        outcome: str,
+        token_id: Optional[str],
+        o_pin: Optional[float],
+        p_yes: Optional[float],
+        best_ask: Optional[float],
+        depth_usd: Optional[float],
+    ) -> None:
+        """Publish the outcome (allocating its row) with the values an evaluation used."""
+        row = self._match_rows.get(match_id, {}).get(outcome)
+        if row is None:
+            row = self._allocate(match_id, outcome)
+            if row is None:
+                return
+        base = _HEADER_SIZE + row * ROW_SIZE
+        self._bind(row, token_id)
+        self._write_group(base + _PIN_OFFSET, _PIN, _nan(o_pin))
+        self._write_group(base + _PM_OFFSET, _PM, _nan(p_yes), (token_id or "").encode())
+        self._write_group(base + _BOOK_OFFSET, _BOOK, _nan(best_ask), _nan(depth_usd))
+
+    def release(self, match_id: str) -> None:
+        """Free the rows of a match that is no longer paired."""
+        rows = self._match_rows.pop(match_id, None)
+        if not rows:
+            return
+        for row in rows.values():
+            base = _HEADER_SIZE + row * ROW_SIZE
+            # Clear the key first: readers re-check it and drop the row before values go.
+            self._write_group(base + _KEY_OFFSET, _KEY, b"")
+            self._write_group(base + _PIN_OFFSET, _PIN, math.nan)
+            self._write_group(base + _PM_OFFSET, _PM, math.nan, b"")
+            self._write_group(base + _BOOK_OFFSET, _BOOK, math.nan, math.nan)
+            self._bind(row, None)
+            self._free.append(row)
+        self.released += len(rows)
+
+    def apply(self, operations: List[tuple]) -> None:
+        """Replay the writes an ``OddsTableForwarder`` buffered, in order."""
+        for operation, values in operations:
+            if operation == "release":
+                self.release(*values)
+            else:
+                self.write_evaluation(*values)
+
+    # -- reader (any process) ----------------------------------------------------------
+
+    def _read_group(self, offset: int, layout: struct.Struct) -> Tuple[int, tuple]:
+        buf = self._buf
+        while True:
+            before = _SEQ.unpack_from(buf, offset)[0]
+            if not before & 1:
+                values = layout.unpack_from(buf, offset + _SEQ.size)
+                if _SEQ.unpack_from(buf, offset)[0] == before:
+                    return before, values
+            self.retries += 1
+            # The writer was interrupted mid-group: let it run.
+            time.sleep(0)
+
+    def _scan(self) -> None:
+        self._rows = {}
+        for row in range(self._high_water()):
+            key = self._read_group(_HEADER_SIZE + row * ROW_SIZE + _KEY_OFFSET, _KEY)[1][0].rstrip(b"\0")
+            if key:
+                self._rows[key] = row
+
+    def find(self, match_id: str, outcome: str) -> Optional[int]:
+        key = row_key(match_id, outcome)
+        row = self._rows.get(key)
+        if row is None:
+            self._scan()
+            row = self._rows.get(key)
+        return row
+
+    def read(self, row: int) -> OddsRow:
+        """Values of ``row`` as stored; ``get`` also checks that the row still holds the same key."""
+        base = _HEADER_SIZE + row * ROW_SIZE
+        pin_seq, (o_pin,) = self._read_group(base + _PIN_OFFSET, _PIN)
+        pm_seq, (p_yes, token) = self._read_group(base + _PM_OFFSET, _PM)
+        book_seq, (best_ask, depth_usd) = self._read_group(base + _BOOK_OFFSET, _BOOK)
+        token = token.rstrip(b"\0")
+        return OddsRow(
+            o_pin=_float(o_pin),
+            pin_seq=pin_seq,
+            p_yes=_float(p_yes),
+            token_id=token.decode() if token else None,
+            pm_seq=pm_seq,
+            best_ask=_float(best_ask),
+            depth_usd=_float(depth_usd),
+            book_seq=book_seq,
+        )
+
+    def _read_keyed(self, row: int) -> Tuple[bytes, Optional[OddsRow]]:
+        offset = _HEADER_SIZE + row * ROW_SIZE + _KEY_OFFSET
+        key_seq, (key,) = self._read_group(offset, _KEY)
+        key = key.rstrip(b"\0")
+        if not key:
+            return key, None
+        odds = self.read(row)
+        if _SEQ.unpack_from(self._buf, offset)[0] != key_seq:
+            return key, None
+        return key, odds
+
+    def get(self, match_id: str, outcome: str) -> Optional[OddsRow]:
+        key = row_key(match_id, outcome)
+        for _ in range(2):
+            row = self.find(match_id, outcome)
+            if row is None:
+                return None
+            stored, odds = self._read_keyed(row)
+            if stored == key and odds is not None:
+                return odds
+            # Released or reused since the directory was read.
+            self._rows.pop(key, None)
+        return None
+
+    def entries(self) -> Iterator[Tuple[str, str, OddsRow]]:
+        """Every published row as ``(match_id, outcome, row)``; hashed long keys come back as-is."""
+        for row in range(self._high_water()):
+            key, odds = self._read_keyed(row)
+            if odds is None:
+                continue
+            match_id, _, outcome = key.decode().partition("\x1f")
+            yield match_id, outcome, odds
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "rows": len(self),
+            "free": len(self._free),
+            "bound_tokens": len(self._token_rows),
+            "writes": self.writes,
+            "released": self.released,
+            "dropped": self.dropped,
+            "read_retries": self.retries,
+        }
+
+
+class OddsTableForwarder:
+    """Stand-in for ``OddsTable`` in strategy workers: buffers writes for the main process."""
+
+    def __init__(self) -> None:
+        self._pending: List[tuple] = []
+        self.forwarded = 0
+
+    def write_evaluation(self, *values) -> None:
+        self._pending.append(("evaluation", values))
+
+    def release(self, match_id: str) -> None:
+        self._pending.append(("release", (match_id,)))
+
+    def drain(self) -> List[tuple]:
+        pending, self._pending = self._pending, []
+        self.forwarded += len(pending)
+        return pending
+
+    def stats(self) -> dict:
+        return {"forwarded": self.forwarded, "pending": len(self._pending)}
@@ -1,122 +1,663 @@
 """Orderbook helpers for Polymarket."""
 from __future__ import annotations
 
+import asyncio
 import time
-from typing import Dict, Optional, Tuple
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
 import httpx
 from loguru import logger
 
-ORDERBOOK_CACHE: Dict[str, tuple[dict, float]] = {}
+from . import config
+from .metrics import LatencyStats
+from .state import BotState
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    from .book_stream import BookStream
+
 ORDERBOOK_TTL_SEC = 2.0
 
 
-async def fetch_order_book(token_id: str) -> Optional[dict]:
-    if not token_id:
-        return None
+def _parse_levels(levels: object) -> List[Tuple[float, float]]:
+    parsed: List[Tuple[float, float]] = []
+    if not isinstance(levels, list):
+        return parsed
+    for level in levels:
+        try:
+            price = float(level.get("price"))
+            size = float(level.get("size"))
+        except Exception:
+            continue
+        if price > 0 and size > 0:
+            parsed.append((price, size))
+    return parsed
 
-    now = time.time()
-    cached = ORDERBOOK_CACHE.get(token_id)
-    if cached and (now - cached[1]) < ORDERBOOK_TTL_SEC:
-        return cached[0]
-
-    url = "https://clob.polymarket.com/book"
-    param_candidates = (
-        {"asset_id": token_id},
-        {"market": token_id},
-        {"tokens": token_id},
+
+class ParsedBook:
+    """Order book parsed once into sorted price arrays with cumulative shares and notional.
+
+    Asks are stored best (lowest) first, bids best (highest) first, so depth up to a
+    price and fills up to a notional are prefix-sum lookups found by bisection.
+    """
+
+    __slots__ = (
+        "ask_prices",
+        "ask_cum_shares",
+        "ask_cum_usd",
+        "bid_prices",
+        "_bid_neg_prices",
+        "bid_cum_shares",
+        "bid_cum_usd",
+        "hash",
+        "timestamp",
     )
 
+    def __init__(
+        self,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        *,
+        book_hash: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> None:
+        ask_levels = sorted(asks)
+        bid_levels = sorted(bids, reverse=True)
+        self.ask_prices = array("d", (price for price, _ in ask_levels))
+        self.ask_cum_shares = array("d", accumulate(size for _, size in ask_levels))
+        self.ask_cum_usd = array("d", accumulate(price * size for price, size in ask_levels))
+        self.bid_prices = array("d", (price for price, _ in bid_levels))
+        self._bid_neg_prices = array("d", (-price for price, _ in bid_levels))
+        self.bid_cum_shares = array("d", accumulate(size for _, size in bid_levels))
+        self.bid_cum_usd = array("d", accumulate(price * size for price, size in bid_levels))
+        self.hash = book_hash
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_raw(cls, raw: dict) -> "ParsedBook":
+        if not isinstance(raw, dict):
+            return cls((), ())
+        return cls(
+            _parse_levels(raw.get("bids")),
+            _parse_levels(raw.get("asks")),
+            book_hash=raw.get("hash"),
+            timestamp=raw.get("timestamp"),
+        )
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bid_prices[0] if self.bid_prices else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.ask_prices[0] if self.ask_prices else None
+
+    def depth_to_price(self, max_price: float) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """Shares, notional and VWAP of all asks priced at or below ``max_price``."""
+        count = bisect_right(self.ask_prices, max_price)
+        if count == 0:
+            return None, None, None
+        shares = self.ask_cum_shares[count - 1]
+        usd = self.ask_cum_usd[count - 1]
+        return shares, usd, usd / shares
+
+    def fill_on_bids(self, min_price: float, target_usd: float) -> Tuple[float, float, Optional[float]]:
+        """Notional, shares and VWAP of selling ``target_usd`` into bids priced at or above ``min_price``."""
+        count = bisect_right(self._bid_neg_prices, -min_price)
+        if count == 0:
+            return 0.0, 0.0, None
+        # Levels that fit entirely inside the target, then a partial fill of the next one.
+        whole = bisect_right(self.bid_cum_usd, target_usd + 1e-9, 0, count)
+        filled_usd = self.bid_cum_usd[whole - 1] if whole else 0.0
+        filled_shares = self.bid_cum_shares[whole - 1] if whole else 0.0
+        if whole < count and filled_usd < target_usd:
+            filled_shares += (target_usd - filled_usd) / self.bid_prices[whole]
+            filled_usd = target_usd
+        if filled_shares > 0:
+            return filled_usd, filled_shares, filled_usd / filled_shares
+        return 0.0, 0.0, None
+
+
+def as_parsed_book(book: ParsedBook | dict) -> ParsedBook:
+    return book if isinstance(book, ParsedBook) else ParsedBook.from_raw(book)
+
+
+class OrderBookCache:
+    """Bounded LRU cache of order books; each reader decides how old a book it accepts."""
+
+    def __init__(self, max_entries: int, default_ttl_sec: float, retention_sec: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.default_ttl_sec = default_ttl_sec
+        # Entries older than this are useless to every caller and get purged.
+        self.retention_sec = max(retention_sec, default_ttl_sec)
+        self._entries: "OrderedDict[str, tuple[ParsedBook, float]]" = OrderedDict()
+        self._last_purge = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token_id: str, max_age: Optional[float] = None) -> Optional[ParsedBook]:
+        entry = self._entries.get(token_id)
+        ttl = self.default_ttl_sec if max_age is None else max_age
+        if entry is None or (time.time() - entry[1]) >= ttl:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token_id)
+        self.hits += 1
+        return entry[0]
+
+    def peek(self, token_id: str) -> Optional[tuple[ParsedBook, float]]:
+        """Return ``(book, fetched_at)`` whatever its age, without counting a hit or miss."""
+        entry = self._entries.get(token_id)
+        if entry is not None:
+            self._entries.move_to_end(token_id)
+        return entry
+
+    def age(self, token_id: str) -> Optional[float]:
+        entry = self._entries.get(token_id)
+        return (time.time() - entry[1]) if entry is not None else None
+
+    def put(self, token_id: str, book: ParsedBook, fetched_at: Optional[float] = None) -> None:
+        now = time.time()
+        self._entries[token_id] = (book, now if fetched_at is None else fetched_at)
+        self._entries.move_to_end(token_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        if now - self._last_purge >= 1.0:
+            self.purge_expired(now)
+
+    def purge_expired(self, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self._last_purge = now
+        expired = [token_id for token_id, (_, ts) in self._entries.items() if now - ts >= self.retention_sec]
+        for token_id in expired:
+            del self._entries[token_id]
+        self.expirations += len(expired)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+ORDERBOOK_CACHE = OrderBookCache(
+    config.settings.orderbook_cache_max_entries,
+    ORDERBOOK_TTL_SEC,
+    config.settings.orderbook_cache_retention_sec,
+)
+
+CLOB_HTTP_STATS = LatencyStats()
+_connection_events: Dict[str, int] = {"tcp_connects": 0, "tls_handshakes": 0}
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Query parameter names the /book endpoint has accepted over time. The one that
+# works is learned (globally, with per-token overrides) so steady-state fetches
+# cost exactly one request; the others are probed only after a failure.
+BOOK_QUERY_PARAMS = ("token_id", "asset_id", "market", "tokens")
+# Statuses meaning "wrong parameter"; anything else (5xx, 429, timeouts) is not probed around.
+# A 404 is also the CLOB's answer for a token without a book, so it is probed only
+# until a parameter has been learned.
+_BOOK_PARAM_REJECTED = frozenset({400, 422})
+BOOK_PARAM_STATS: Dict[str, int] = {"fetches": 0, "requests": 0, "probe_misses": 0, "relearned": 0, "no_book": 0}
+_book_param_default: Optional[str] = None
+_book_param_by_token: Dict[str, str] = {}
+
+# None until POST /books has been tried; False while it is unsupported, retried after
+# ``_MULTI_BOOK_RETRY_SEC`` in case it comes back.
+_multi_book_supported: Optional[bool] = None
+_multi_book_retry_at = 0.0
+_MULTI_BOOK_RETRY_SEC = 300.0
+BATCH_STATS: Dict[str, int] = {"batches": 0, "multi_requests": 0, "fanout_fetches": 0}
+
+# Streaming L2 books (BOOK_SOURCE=stream); consulted before the cache when attached.
+_book_source: Optional["BookStream"] = None
+
+# Single-flight: concurrent callers for the same token share one network fetch.
+_inflight: Dict[str, asyncio.Future] = {}
+COALESCE_STATS: Dict[str, int] = {"issued": 0, "coalesced": 0}
+# Keeps ``start_order_books`` loads referenced until they finish.
+_background_loads: set[asyncio.Task] = set()
+
+
+async def _trace_connections(event_name: str, info: dict) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _connection_events["tcp_connects"] += 1
+    elif event_name == "connection.start_tls.complete":
+        _connection_events["tls_handshakes"] += 1
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client for the CLOB REST API, creating it on first use."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        return _http_client
+
+    settings = config.settings
+    http2 = settings.clob_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("CLOB_HTTP2 requested but the 'h2' package is missing; using HTTP/1.1.")
+            http2 = False
+
+    _http_client = httpx.AsyncClient(
+        base_url=settings.clob_api_url,
+        timeout=settings.clob_http_timeout_sec,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.clob_http_max_connections,
+            max_keepalive_connections=settings.clob_http_max_keepalive,
+            keepalive_expiry=settings.clob_http_keepalive_expiry_sec,
+        ),
+    )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is None:
+        return
+    client, _http_client = _http_client, None
+    await client.aclose()
+    logger.info("CLOB HTTP client closed. Stats: %s", http_stats())
+
+
+def http_stats() -> dict:
+    stats = CLOB_HTTP_STATS.as_dict()
+    stats.update(_connection_events)
+    stats["book_params"] = dict(BOOK_PARAM_STATS, learned_default=_book_param_default)
+    stats["batch"] = dict(BATCH_STATS, multi_book_supported=_multi_book_supported)
+    stats["single_flight"] = dict(COALESCE_STATS, in_flight=len(_inflight))
+    stats["cache"] = ORDERBOOK_CACHE.stats()
+    if _book_source is not None:
+        stats["stream"] = _book_source.stats()
+    return stats
+
+
+def attach_book_source(source: Optional["BookStream"]) -> None:
+    global _book_source
+    _book_source = source
+
+
+def watch_tokens(token_ids: Iterable[str]) -> None:
+    """Tell the streaming source which tokens the strategy currently evaluates."""
+    if _book_source is not None:
+        _book_source.watch(token_ids)
+
+
+def book_age(token_id: str) -> Optional[float]:
+    if _book_source is not None:
+        age = _book_source.age(token_id)
+        if age is not None:
+            return age
+    return ORDERBOOK_CACHE.age(token_id)
+
+
+def book_version(token_id: str) -> Optional[tuple]:
+    """Identity of the book an evaluation would use right now, without network I/O.
+
+    Changes whenever that book is refetched or updated; ``None`` when none is held.
+    """
+    if _book_source is not None:
+        version = _book_source.version(token_id)
+        if version is not None:
+            return version
+    entry = ORDERBOOK_CACHE.peek(token_id)
+    return ("cache", entry[0].hash, entry[1]) if entry is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class ServedBook:
+    """A book together with the age and version it was served at."""
+
+    book: ParsedBook
+    age: Optional[float]
+    version: Optional[tuple]
+
+
+def served_book(token_id: str, max_age: Optional[float] = None) -> Optional[ServedBook]:
+    """The book an evaluation would use right now, without network I/O.
+
+    A streamed book is served whatever its age; a cached copy only if it is at most
+    ``max_age`` seconds old.
+    """
+    if _book_source is not None:
+        book = _book_source.get(token_id)
+        if book is not None:
+            return ServedBook(book, _book_source.age(token_id), _book_source.version(token_id))
+    entry = ORDERBOOK_CACHE.peek(token_id)
+    if entry is None:
+        return None
+    age = time.time() - entry[1]
+    if max_age is not None and age > max_age:
+        return None
+    return ServedBook(entry[0], age, ("cache", entry[0].hash, entry[1]))
+
+
+def _book_param_order(token_id: str) -> list[str]:
+    preferred = _book_param_by_token.get(token_id) or _book_param_default
+    if preferred is None:
+        return list(BOOK_QUERY_PARAMS)
+    return [preferred] + [name for name in BOOK_QUERY_PARAMS if name != preferred]
+
+
+def _learn_book_param(token_id: str, name: str, first_choice: str) -> None:
+    global _book_param_default
+    if name != first_choice:
+        BOOK_PARAM_STATS["relearned"] += 1
+        # The shared default stopped working: assume the API changed for everyone.
+        if first_choice == _book_param_default:
+            _book_param_default = name
+    if _book_param_default is None:
+        _book_param_default = name
+    if name == _book_param_default:
+        _book_param_by_token.pop(token_id, None)
+    else:
+        _book_param_by_token[token_id] = name
+
+
+async def _request_book(client: httpx.AsyncClient, token_id: str) -> Optional[dict]:
+    BOOK_PARAM_STATS["fetches"] += 1
+    order = _book_param_order(token_id)
+    for name in order:
+        BOOK_PARAM_STATS["requests"] += 1
+        started = time.perf_counter()
+        try:
+            resp = await client.get("/book", params={name: token_id}, extensions={"trace": _trace_connections})
+        except Exception:
+            CLOB_HTTP_STATS.errors += 1
+            raise
+        CLOB_HTTP_STATS.observe(time.perf_counter() - started)
+        if resp.status_code == 404 and (_book_param_default is not None or token_id in _book_param_by_token):
+            BOOK_PARAM_STATS["no_book"] += 1
+            return None
+        if resp.status_code not in (200, 404) and resp.status_code not in _BOOK_PARAM_REJECTED:
+            return None
+        data = None
+        if resp.status_code == 200:
+            try:
+                data = resp.json()
+            except ValueError:
+                data = None
+        if isinstance(data, dict) and "asks" in data and "bids" in data:
+            _learn_book_param(token_id, name, order[0])
+            return data
+        BOOK_PARAM_STATS["probe_misses"] += 1
+    return None
+
+
+def _begin_flight(token_id: str) -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    _inflight[token_id] = future
+    COALESCE_STATS["issued"] += 1
+    return future
+
+
+def _end_flight(token_id: str, future: asyncio.Future, book: Optional[ParsedBook]) -> None:
+    if _inflight.get(token_id) is future:
+        del _inflight[token_id]
+    if not future.done():
+        future.set_result(book)
+
+
+async def _fetch_uncached(token_id: str) -> Optional[ParsedBook]:
+    now = time.time()
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            for params in param_candidates:
-                try:
-                    resp = await client.get(url, params=params)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if isinstance(data, dict) and "asks" in data and "bids" in data:
-                            ORDERBOOK_CACHE[token_id] = (data, now)
-                            return data
-                except Exception:
-                    continue
+        data = await _request_book(get_http_client(), token_id)
     except Exception as exc:
         logger.debug("fetch_order_book error for token %s: %s", token_id, exc)
-    return None
+        return None
+    if data is None:
+        return None
+    book = ParsedBook.from_raw(data)
+    ORDERBOOK_CACHE.put(token_id, book, now)
+    return book
 
 
-def summarize_liquidity_to_price(book: dict, max_price: float) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+async def fetch_raw_book(token_id: str) -> Optional[dict]:
+    """Fetch the unparsed REST snapshot, bypassing cache and stream (used for resyncs)."""
     try:
-        asks = book.get("asks", []) if isinstance(book, dict) else []
-        total_shares = 0.0
-        total_usd = 0.0
-        for level in asks:
-            try:
-                price = float(level.get("price"))
-                size = float(level.get("size"))
-            except Exception:
-                continue
-            if price <= max_price and price > 0 and size > 0:
-                total_shares += size
-                total_usd += price * size
-        if total_shares > 0 and total_usd > 0:
-            return total_shares, total_usd, total_usd / total_shares
+        return await _request_book(get_http_client(), token_id)
+    except Exception as exc:
+        logger.debug("fetch_raw_book error for token %s: %s", token_id, exc)
+        return None
+
+
+async def fetch_order_book(token_id: str, *, max_age: Optional[float] = None) -> Optional[ParsedBook]:
+    """Return the book for ``token_id``, reusing a cached copy younger than ``max_age`` seconds."""
+    if not token_id:
+        return None
+
+    if _book_source is not None:
+        streamed = _book_source.get(token_id)
+        if streamed is not None:
+            return streamed
+
+    cached = ORDERBOOK_CACHE.get(token_id, max_age)
+    if cached is not None:
+        return cached
+
+    pending = _inflight.get(token_id)
+    if pending is not None:
+        COALESCE_STATS["coalesced"] += 1
+        return await asyncio.shield(pending)
+
+    future = _begin_flight(token_id)
+    book = None
+    try:
+        book = await _fetch_uncached(token_id)
+    finally:
+        _end_flight(token_id, future, book)
+    return book
+
+
+async def _request_books_multi(client: httpx.AsyncClient, token_ids: List[str]) -> Dict[str, ParsedBook]:
+    """Fetch several books with one POST /books call; empty result if the endpoint is unusable."""
+    global _multi_book_supported, _multi_book_retry_at
+    BATCH_STATS["multi_requests"] += 1
+    started = time.perf_counter()
+    try:
+        resp = await client.post(
+            "/books",
+            json=[{"token_id": token_id} for token_id in token_ids],
+            extensions={"trace": _trace_connections},
+        )
+    except Exception as exc:
+        CLOB_HTTP_STATS.errors += 1
+        logger.debug("POST /books failed: %s", exc)
+        return {}
+    CLOB_HTTP_STATS.observe(time.perf_counter() - started)
+
+    if resp.status_code in (400, 404, 405, 501):
+        if _multi_book_supported is not False:
+            logger.info("CLOB multi-book endpoint unavailable (status %s); using per-token fan-out.", resp.status_code)
+        # Also when it worked before: otherwise every tick pays a failed batch first.
+        _multi_book_supported = False
+        _multi_book_retry_at = time.monotonic() + _MULTI_BOOK_RETRY_SEC
+        return {}
+    if resp.status_code != 200:
+        return {}
+    try:
+        payload = resp.json()
+    except ValueError:
+        return {}
+    if not isinstance(payload, list):
+        return {}
+
+    _multi_book_supported = True
+    books: Dict[str, ParsedBook] = {}
+    for book in payload:
+        if isinstance(book, dict) and "asks" in book and "bids" in book and book.get("asset_id"):
+            books[str(book["asset_id"])] = ParsedBook.from_raw(book)
+    return books
+
+
+def _claim_books(
+    token_ids: Iterable[str], max_age: Optional[float]
+) -> Tuple[Dict[str, Optional[ParsedBook]], Dict[str, asyncio.Future], Dict[str, asyncio.Future]]:
+    """Split tokens into books held now, flights to join and flights this caller owns."""
+    BATCH_STATS["batches"] += 1
+    results: Dict[str, Optional[ParsedBook]] = {}
+    missing: List[str] = []
+    for token_id in dict.fromkeys(token_ids):
+        if not token_id:
+            continue
+        streamed = _book_source.get(token_id) if _book_source is not None else None
+        if streamed is not None:
+            results[token_id] = streamed
+            continue
+        cached = ORDERBOOK_CACHE.get(token_id, max_age)
+        if cached is not None:
+            results[token_id] = cached
+        else:
+            missing.append(token_id)
+
+    # Tokens another caller is already fetching are awaited, not requested again.
+    joined = {token_id: _inflight[token_id] for token_id in missing if token_id in _inflight}
+    COALESCE_STATS["coalesced"] += len(joined)
+    owned = {token_id: _begin_flight(token_id) for token_id in missing if token_id not in joined}
+    return results, joined, owned
+
+
+async def _load_books(futures: Dict[str, asyncio.Future], results: Dict[str, Optional[ParsedBook]]) -> None:
+    """Fetch the owned tokens; each flight ends as soon as its own book is known."""
+    settings = config.settings
+    owned = list(futures)
+    now = time.time()
+    try:
+        if owned and (_multi_book_supported is not False or time.monotonic() >= _multi_book_retry_at):
+            client = get_http_client()
+            batch_size = max(1, settings.clob_books_batch_size)
+
+            async def fetch_chunk(chunk: List[str]) -> None:
+                for token_id, book in (await _request_books_multi(client, chunk)).items():
+                    if token_id in futures:
+                        ORDERBOOK_CACHE.put(token_id, book, now)
+                        results[token_id] = book
+                        _end_flight(token_id, futures[token_id], book)
+
+            await asyncio.gather(*(fetch_chunk(owned[i:i + batch_size]) for i in range(0, len(owned), batch_size)))
+
+        remaining = [token_id for token_id in owned if token_id not in results]
+        if remaining:
+            semaphore = asyncio.Semaphore(max(1, settings.clob_fetch_concurrency))
+
+            async def fetch_one(token_id: str) -> None:
+                async with semaphore:
+                    BATCH_STATS["fanout_fetches"] += 1
+                    results[token_id] = await _fetch_uncached(token_id)
+                    _end_flight(token_id, futures[token_id], results[token_id])
+
+            await asyncio.gather(*(fetch_one(token_id) for token_id in remaining))
+    finally:
+        for token_id, future in futures.items():
+            _end_flight(token_id, future, results.get(token_id))
+
+
+async def fetch_order_books(
+    token_ids: Iterable[str],
+    *,
+    max_age: Optional[float] = None,
+) -> Dict[str, Optional[ParsedBook]]:
+    """Load books for many tokens at once: cache first, then POST /books, then bounded fan-out."""
+    results, joined, owned = _claim_books(token_ids, max_age)
+    if owned:
+        await _load_books(owned, results)
+    for token_id, future in joined.items():
+        results[token_id] = await asyncio.shield(future)
+    return results
+
+
+def start_order_books(token_ids: Iterable[str]) -> Dict[str, asyncio.Future]:
+    """Start one background ``fetch_order_books`` and return a future per token.
+
+    Each future resolves as soon as its own book is known (``None`` when there is none),
+    so a caller needing a few of the tokens is not held up by the rest of the batch.
+    Callers that may give up should wait through ``asyncio.shield``: the futures are shared.
+    """
+    results, joined, owned = _claim_books(token_ids, None)
+    loop = asyncio.get_running_loop()
+    futures: Dict[str, asyncio.Future] = {}
+    for token_id, book in results.items():
+        futures[token_id] = loop.create_future()
+        futures[token_id].set_result(book)
+    futures.update(joined)
+    futures.update(owned)
+    if owned:
+        task = loop.create_task(_load_books(owned, {}))
+        _background_loads.add(task)
+        task.add_done_callback(_finish_background_load)
+    return futures
+
+
+def _finish_background_load(task: asyncio.Task) -> None:
+    _background_loads.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Background book load failed: %s", task.exception())
+
+
+async def run_book_refresher(state: BotState) -> None:
+    """Keep books of hot tokens and open paper positions warm so evaluators never wait on them."""
+    interval = max(config.settings.book_refresh_interval_sec, 0.1)
+    while True:
+        try:
+            now = time.monotonic()
+            for token_id in [token_id for token_id, until in state.hot_tokens.items() if until <= now]:
+                del state.hot_tokens[token_id]
+            tokens = set(state.hot_tokens)
+            tokens.update(getattr(state, "paper_positions", None) or {})
+            if tokens:
+                await fetch_order_books(tokens, max_age=interval)
+        except Exception as exc:
+            logger.debug("Book refresher error: %s", exc)
+        await asyncio.sleep(interval)
+
+
+def summarize_liquidity_to_price(
+    book: ParsedBook | dict,
+    max_price: float,
+) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    try:
+        return as_parsed_book(book).depth_to_price(max_price)
     except Exception as exc:
         logger.debug("summarize_liquidity_to_price error: %s", exc)
     return None, None, None
 
 
-def estimate_fill_on_bids(book: dict, min_price: float, target_usd: float) -> Tuple[float, float, Optional[float]]:
+def estimate_fill_on_bids(
+    book: ParsedBook | dict,
+    min_price: float,
+    target_usd: float,
+) -> Tuple[float, float, Optional[float]]:
     try:
-        bids = book.get("bids", []) if isinstance(book, dict) else []
-        levels = []
-        for level in bids:
-            try:
-                price = float(level.get("price"))
-                size = float(level.get("size"))
-            except Exception:
-                continue
-            if price >= min_price and price > 0 and size > 0:
-                levels.append((price, size))
-        if not levels:
-            return 0.0, 0.0, None
-        levels.sort(key=lambda x: x[0], reverse=True)
-
-        filled_usd = 0.0
-        filled_shares = 0.0
-        for price, size in levels:
-            if filled_usd >= target_usd:
-                break
-            level_usd = price * size
-            need_usd = target_usd - filled_usd
-            if level_usd <= need_usd + 1e-9:
-                filled_usd += level_usd
-                filled_shares += size
-            else:
-                add_shares = need_usd / price
-                filled_usd += need_usd
-                filled_shares += add_shares
-                break
-
-        if filled_shares > 0:
-            return filled_usd, filled_shares, filled_usd / filled_shares
-        return 0.0, 0.0, None
+        return as_parsed_book(book).fill_on_bids(min_price, target_usd)
     except Exception as exc:
         logger.debug("estimate_fill_on_bids error: %s", exc)
         return 0.0, 0.0, None
 
 
-def get_best_bid_price(book: dict) -> Optional[float]:
+def get_best_bid_price(book: ParsedBook | dict) -> Optional[float]:
     try:
-        bids = book.get("bids", []) if isinstance(book, dict) else []
-        best = 0.0
-        for level in bids:
-            try:
-                price = float(level.get("price"))
-                size = float(level.get("size"))
-            except Exception:
-                continue
-            if size > 0 and price > best:
-                best = price
-        return best if best > 0 else None
+        return as_parsed_book(book).best_bid
     except Exception:
         return None
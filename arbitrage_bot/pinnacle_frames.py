@@ -0,0 +1,134 @@
+"""Decoding of Pinnacle parser websocket frames into the lean dicts the bot keeps.
+
+Frames are Go ``shared.GameData`` structs. Only the identity fields, scores and the
+first period's ``Win1x2`` odds are read downstream, so ``Raw`` blobs and the
+``Games``/``Totals``/``Handicap``/team-total maps are dropped at decode time.
+
+``msgspec`` (typed schema, unknown fields skipped without being built) or ``orjson``
+are used when installed; the stdlib ``json`` module is the fallback.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from . import config
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_IDENTITY_FIELDS = ("Pid", "LeagueName", "SportName", "MatchId", "homeName", "awayName", "isLive", "HomeScore", "AwayScore")
+_WIN1X2_KEYS = ("Win1", "Win2", "WinNone")
+
+
+def _finish(frame: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not frame.get("MatchId") or not frame.get("homeName") or not frame.get("awayName"):
+        return None
+    frame["match"] = f"{frame['homeName']} vs {frame['awayName']}"
+    return frame
+
+
+def lean_frame(data: Any) -> Optional[Dict[str, Any]]:
+    """Reduce a fully decoded frame to the fields the bot uses; ``None`` if it is unusable."""
+    if not isinstance(data, dict):
+        return None
+    frame = {key: data[key] for key in _IDENTITY_FIELDS if key in data}
+    periods = data.get("Periods")
+    first = periods[0] if isinstance(periods, list) and periods else None
+    win1x2 = first.get("Win1x2") if isinstance(first, dict) else None
+    if isinstance(win1x2, dict):
+        odds = {}
+        for key in _WIN1X2_KEYS:
+            odd = win1x2.get(key)
+            if isinstance(odd, dict):
+                odds[key] = {"value": odd.get("value")}
+        frame["Periods"] = [{"Win1x2": odds}]
+    return _finish(frame)
+
+
+def _decode_json(message: str | bytes) -> Optional[Dict[str, Any]]:
+    return lean_frame(json.loads(message))
+
+
+def _decode_orjson(message: str | bytes) -> Optional[Dict[str, Any]]:
+    return lean_frame(orjson.loads(message))
+
+
+if msgspec is not None:
+
+    class _Odd(msgspec.Struct):
+        value: Optional[float] = None
+
+    class _Win1x2(msgspec.Struct):
+        Win1: Optional[_Odd] = None
+        Win2: Optional[_Odd] = None
+        WinNone: Optional[_Odd] = None
+
+    class _Period(msgspec.Struct):
+        Win1x2: Optional[_Win1x2] = None
+
+    class _GameData(msgspec.Struct):
+        MatchId: Optional[str] = None
+        homeName: Optional[str] = None
+        awayName: Optional[str] = None
+        Pid: Optional[int] = None
+        LeagueName: Optional[str] = None
+        SportName: Optional[str] = None
+        isLive: Optional[bool] = None
+        HomeScore: Optional[float] = None
+        AwayScore: Optional[float] = None
+        Periods: Optional[List[_Period]] = None
+
+    _game_data_decoder = msgspec.json.Decoder(_GameData)
+
+    def _decode_msgspec(message: str | bytes) -> Optional[Dict[str, Any]]:
+        try:
+            game = _game_data_decoder.decode(message)
+        except msgspec.ValidationError:
+            # Schema drift on the Go side: fall back to the untyped path for this frame.
+            return _decode_json(message)
+        frame: Dict[str, Any] = {}
+        for key in _IDENTITY_FIELDS:
+            value = getattr(game, key)
+            if value is not None:
+                frame[key] = value
+        win1x2 = game.Periods[0].Win1x2 if game.Periods else None
+        if win1x2 is not None:
+            odds = {}
+            for key in _WIN1X2_KEYS:
+                odd = getattr(win1x2, key)
+                if odd is not None:
+                    odds[key] = {"value": odd.value}
+            frame["Periods"] = [{"Win1x2": odds}]
+        return _finish(frame)
+
+
+DECODERS: Dict[str, Callable[[str | bytes], Optional[Dict[str, Any]]]] = {"json": _decode_json}
+if orjson is not None:
+    DECODERS["orjson"] = _decode_orjson
+if msgspec is not None:
+    DECODERS["msgspec"] = _decode_msgspec
+
+
+def _select_decoder(name: str) -> str:
+    if name in DECODERS:
+        return name
+    if name not in {"", "auto"}:
+        logger.warning("PINNACLE_DECODER=%s is not available; choosing automatically.", name)
+    for candidate in ("msgspec", "orjson", "json"):
+        if candidate in DECODERS:
+            return candidate
+    return "json"
+
+
+DECODER_NAME = _select_decoder(config.settings.pinnacle_decoder)
+decode_frame = DECODERS[DECODER_NAME]
@@ -0,0 +1,268 @@
+"""Immutable records for Pinnacle matches and Polymarket events, built once at ingestion.
+
+Pinnacle frames and Gamma events arrive as JSON dicts whose market fields are
+themselves JSON strings (``outcomes``, ``outcomePrices``, ``clobTokenIds``). Parsing
+them here, once per update, lets the strategy read typed attributes instead of
+repeating ``.get()`` chains and ``json.loads`` on every tick.
+"""
+from __future__ import annotations
+
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Number of JSON-string market fields decoded so far; the strategy reports its per-tick delta.
+PARSE_STATS: Dict[str, int] = {"json_lists": 0}
+
+# Raw market fields a PolymarketMarket is built from; their values form the market's content version.
+MARKET_SOURCE_FIELDS = (
+    "id",
+    "question",
+    "groupItemTitle",
+    "sportsMarketType",
+    "outcomes",
+    "outcomePrices",
+    "prices",
+    "clobTokenIds",
+    "active",
+    "closed",
+    "enableOrderBook",
+    "liquidityNum",
+)
+
+
+def _json_list(raw: Any) -> Optional[list]:
+    """Decode a Gamma JSON-string list; ``None`` when missing or malformed."""
+    if isinstance(raw, list):
+        return raw
+    if not isinstance(raw, str):
+        return None
+    PARSE_STATS["json_lists"] += 1
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        return None
+    return value if isinstance(value, list) else None
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class PinnacleOdds:
+    name: str
+    name_lower: str
+    price: float
+
+
+@dataclass(frozen=True, slots=True)
+class PinnacleMatch:
+    match_id: str
+    home: str
+    away: str
+    title: str
+    odds: Tuple[PinnacleOdds, ...]
+    pid: Optional[int] = None
+    league: Optional[str] = None
+    sport: Optional[str] = None
+    is_live: bool = False
+    home_score: Optional[float] = None
+    away_score: Optional[float] = None
+
+    @classmethod
+    def from_frame(cls, frame: Dict[str, Any]) -> "PinnacleMatch":
+        """Build from a decoded frame (see ``pinnacle_frames``) or a test-mode event dict."""
+        home = frame["homeName"]
+        away = frame["awayName"]
+        odds = []
+        periods = frame.get("Periods")
+        first = periods[0] if isinstance(periods, list) and periods else None
+        win1x2 = first.get("Win1x2") if isinstance(first, dict) else None
+        if isinstance(win1x2, dict):
+            for key, name in (("Win1", home), ("Win2", away), ("WinNone", "Draw")):
+                odd = win1x2.get(key)
+                price = odd.get("value") if isinstance(odd, dict) else None
+                if price:
+                    odds.append(PinnacleOdds(name, name.lower(), float(price)))
+        return cls(
+            match_id=frame["MatchId"],
+            home=home,
+            away=away,
+            title=frame.get("match") or f"{home} vs {away}",
+            odds=tuple(odds),
+            pid=frame.get("Pid"),
+            league=frame.get("LeagueName"),
+            sport=frame.get("SportName"),
+            is_live=bool(frame.get("isLive")),
+            home_score=frame.get("HomeScore"),
+            away_score=frame.get("AwayScore"),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Frame-shaped dict for snapshots."""
+        return {
+            "MatchId": self.match_id,
+            "Pid": self.pid,
+            "LeagueName": self.league,
+            "SportName": self.sport,
+            "homeName": self.home,
+            "awayName": self.away,
+            "match": self.title,
+            "isLive": self.is_live,
+            "HomeScore": self.home_score,
+            "AwayScore": self.away_score,
+            "odds": {odds.name: odds.price for odds in self.odds},
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class PolymarketMarket:
+    market_id: Optional[str]
+    question_lower: str
+    group_item_title_lower: str
+    sports_market_type: Optional[str]
+    outcomes: Tuple[str, ...]
+    # ``outcomePrices`` (or ``prices`` when that is missing/malformed); unparsable entries are None.
+    prices: Tuple[Optional[float], ...]
+    token_ids: Tuple[str, ...]
+    active: bool
+    closed: bool
+    enable_order_book: bool
+    liquidity: float
+    # False when any of the JSON-string fields failed to parse.
+    well_formed: bool
+
+    @classmethod
+    def from_raw(cls, market: Dict[str, Any]) -> "PolymarketMarket":
+        outcomes = _json_list(market.get("outcomes", "[]"))
+        prices = _json_list(market.get("outcomePrices", "[]"))
+        if prices is None:
+            prices = _json_list(market.get("prices", "[]"))
+        tokens = _json_list(market.get("clobTokenIds", "[]"))
+        sports_market_type = market.get("sportsMarketType")
+        return cls(
+            market_id=market.get("id"),
+            question_lower=(market.get("question") or "").lower(),
+            group_item_title_lower=(market.get("groupItemTitle") or "").lower(),
+            sports_market_type=sys.intern(sports_market_type) if isinstance(sports_market_type, str) else None,
+            # Outcome labels repeat across markets ("Yes"/"No"), so share one copy.
+            outcomes=tuple(sys.intern(str(outcome)) for outcome in outcomes or ()),
+            prices=tuple(_float_or_none(price) for price in prices or ()),
+            token_ids=tuple(str(token) for token in tokens or ()),
+            active=bool(market.get("active")),
+            closed=bool(market.get("closed")),
+            enable_order_book=bool(market.get("enableOrderBook", True)),
+            liquidity=_float_or_none(market.get("liquidityNum", 0) or 0.0) or 0.0,
+            well_formed=outcomes is not None and prices is not None and tokens is not None,
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.market_id,
+            "question": self.question_lower,
+            "sportsMarketType": self.sports_market_type,
+            "outcomes": list(self.outcomes),
+            "prices": list(self.prices),
+            "clobTokenIds": list(self.token_ids),
+            "active": self.active,
+            "closed": self.closed,
+            "enableOrderBook": self.enable_order_book,
+            "liquidityNum": self.liquidity,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class PolymarketEvent:
+    event_id: str
+    title: str
+    markets: Tuple[PolymarketMarket, ...]
+    version: str = ""
+    # Changes only when the title or a market's identity, type, question, group title or outcomes do.
+    markets_version: int = 0
+    slug: Optional[str] = None
+    score: Optional[str] = None
+    series_title: Optional[str] = None
+
+    @classmethod
+    def from_raw(
+        cls,
+        event: Dict[str, Any],
+        version: str = "",
+        market_cache: Optional["MarketCache"] = None,
+    ) -> "PolymarketEvent":
+        build_market = market_cache.get_or_parse if market_cache is not None else PolymarketMarket.from_raw
+        series = event.get("series")
+        series_title = series[0].get("title") if isinstance(series, list) and series and isinstance(series[0], dict) else None
+        title = event.get("title") or ""
+        markets = tuple(build_market(market) for market in event.get("markets") or ())
+        return cls(
+            event_id=event["id"],
+            title=title,
+            markets=markets,
+            version=version,
+            markets_version=hash(
+                (
+                    title,
+                    tuple(
+                        (m.market_id, m.sports_market_type, m.question_lower, m.group_item_title_lower, m.outcomes)
+                        for m in markets
+                    ),
+                )
+            ),
+            slug=event.get("slug"),
+            score=event.get("score"),
+            series_title=series_title,
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.event_id,
+            "title": self.title,
+            "slug": self.slug,
+            "score": self.score,
+            "series": self.series_title,
+            "version": self.version,
+            "markets": [market.as_dict() for market in self.markets],
+        }
+
+
+class MarketCache:
+    """Parsed ``PolymarketMarket`` records keyed by market id and content version.
+
+    An event update (a score tick, one repriced market) rebuilds the event record but
+    reuses every market whose source fields are unchanged, so JSON-string fields are
+    decoded only for markets that actually changed.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[tuple, PolymarketMarket]] = {}
+        self.parsed = 0
+        self.reused = 0
+
+    def get_or_parse(self, raw: Dict[str, Any]) -> PolymarketMarket:
+        market_id = raw.get("id")
+        version = tuple(raw.get(key) for key in MARKET_SOURCE_FIELDS)
+        entry = self._entries.get(market_id) if market_id else None
+        if entry is not None and entry[0] == version:
+            self.reused += 1
+            return entry[1]
+        market = PolymarketMarket.from_raw(raw)
+        self.parsed += 1
+        if market_id:
+            self._entries[market_id] = (version, market)
+        return market
+
+    def discard(self, market_ids: Iterable[Optional[str]]) -> None:
+        for market_id in market_ids:
+            self._entries.pop(market_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "parsed": self.parsed, "reused": self.reused}
@@ -0,0 +1,299 @@
+"""Optional multi-process strategy: live matches are partitioned across worker processes.
+
+With ``STRATEGY_WORKERS`` > 0 the main process keeps ingestion (Pinnacle websocket,
+Polymarket poller), approvals, the web UI and trading, and runs ``run_sharded_strategy``
+instead of ``strategy.run_strategy``. It drains ``state.dirty_queue`` and forwards the
+changed records: a Pinnacle match to the one worker that owns it (``STRATEGY_SHARD_BY``:
+a hash of the ``MatchId`` or of the sport), a Polymarket event to every worker, since a
+match in any shard may pair with it. Each worker runs the unchanged ``run_strategy`` on
+its slice, with its own match index, caches, book refresher and book stream, and sends
+its trade intents back. The main process executes them one batch at a time, so
+``recent_trades``, paper positions and the CLOB client stay in one place. Odds-table
+writes (evaluated rows, released matches) are forwarded too, so the main process stays
+its only writer.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import queue
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from . import config, matching, orderbook, strategy, trading
+from .book_stream import BookStream
+from .logging_utils import configure_logging
+from .odds_table import OddsTableForwarder
+from .records import PinnacleMatch
+from .state import BotState
+
+# (source, key, dirty timestamp, kind, record or None once removed)
+Update = Tuple[str, str, float, str, Any]
+
+_REPORT_INTERVAL_SEC = 0.5
+_RESULT_POLL_SEC = 0.5
+
+
+def shard_of(match: PinnacleMatch, workers: int, shard_by: str = "match") -> int:
+    """Worker index owning ``match``; stable across processes and restarts, unlike ``hash``."""
+    key = (match.sport or "") if shard_by == "sport" else match.match_id
+    return zlib.crc32(key.encode()) % workers
+
+
+# -- worker process ---------------------------------------------------------------------
+
+
+def _apply_updates(state: BotState, updates: List[Update]) -> None:
+    for source, key, ts, kind, record in updates:
+        data = state.pinnacle_data if source == "pinnacle" else state.polymarket_data
+        if record is None:
+            data.pop(key, None)
+        else:
+            data[key] = record
+        # Keep the ingestion timestamp (CLOCK_MONOTONIC is system-wide), so latency includes the hand-off.
+        state.dirty_queue.put_nowait((source, key, ts, kind))
+
+
+async def _report(state: BotState, index: int, outbox) -> None:
+    while True:
+        await asyncio.sleep(_REPORT_INTERVAL_SEC)
+        now = time.monotonic()
+        for event_id in [event_id for event_id, until in state.hot_events.items() if until <= now]:
+            del state.hot_events[event_id]
+        outbox.put(("report", index, dict(state.strategy_metrics), dict(state.hot_events)))
+        if state.odds_table is not None:
+            operations = state.odds_table.drain()
+            if operations:
+                outbox.put(("odds", index, operations))
+
+
+async def _run_worker(index: int, inbox, outbox) -> None:
+    state = BotState()
+    if config.settings.odds_table_rows > 0:
+        state.odds_table = OddsTableForwarder()
+    loop = asyncio.get_running_loop()
+    matching.match_approver.set_pending_handler(lambda candidate: outbox.put(("pending", index, candidate)))
+
+    async def forward(intents: List[strategy.TradeIntent]) -> None:
+        outbox.put(("intents", index, intents))
+
+    tasks = [
+        asyncio.create_task(strategy.run_strategy(state, forward)),
+        asyncio.create_task(orderbook.run_book_refresher(state)),
+        asyncio.create_task(_report(state, index, outbox)),
+    ]
+    if config.settings.book_source == "stream":
+        book_stream = BookStream(config.settings.clob_ws_url, resnapshot_sec=config.settings.book_stream_resnapshot_sec)
+        orderbook.attach_book_source(book_stream)
+        tasks.append(asyncio.create_task(book_stream.run()))
+    logger.info("Strategy worker %s started.", index)
+    try:
+        while True:
+            updates = await loop.run_in_executor(None, inbox.get)
+            if updates is None:
+                break
+            _apply_updates(state, updates)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await orderbook.close_http_client()
+
+
+def _worker_main(index: int, inbox, outbox, initializer: Optional[Callable[[], None]]) -> None:
+    configure_logging(config.settings.log_level)
+    if initializer is not None:
+        initializer()
+    try:
+        asyncio.run(_run_worker(index, inbox, outbox))
+    except KeyboardInterrupt:
+        pass
+
+
+# -- main process -----------------------------------------------------------------------
+
+
+class StrategyShards:
+    """Worker processes and the routing of changed records to them.
+
+    A dead worker is restarted and re-seeded with every Polymarket event and its
+    Pinnacle matches.
+    """
+
+    def __init__(self, workers: int, shard_by: str = "match", initializer: Optional[Callable[[], None]] = None) -> None:
+        self.shard_by = shard_by if shard_by in {"match", "sport"} else "match"
+        self.initializer = initializer
+        self._context = multiprocessing.get_context("spawn")
+        self.outbox = self._context.Queue()
+        self._inboxes = [self._context.Queue() for _ in range(max(1, workers))]
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * len(self._inboxes)
+        self._owner: Dict[str, int] = {}
+        self.reports: Dict[int, dict] = {}
+        self.counters: Dict[str, int] = {"forwarded": 0, "batches": 0, "intents": 0, "pending": 0, "restarts": 0}
+
+    def __len__(self) -> int:
+        return len(self._inboxes)
+
+    def start(self, state: BotState) -> None:
+        for index in range(len(self)):
+            self._spawn(index, state)
+
+    def _spawn(self, index: int, state: BotState) -> None:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self._inboxes[index], self.outbox, self.initializer),
+            name=f"strategy-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+        now = time.monotonic()
+        seed: List[Update] = [("polymarket", key, now, "add", event) for key, event in state.polymarket_data.items()]
+        for key, match in state.pinnacle_data.items():
+            owner = shard_of(match, len(self), self.shard_by)
+            self._owner[key] = owner
+            if owner == index:
+                seed.append(("pinnacle", key, now, "add", match))
+        self._send(index, seed)
+
+    def _send(self, index: int, updates: List[Update]) -> None:
+        if updates:
+            self._inboxes[index].put(updates)
+            self.counters["batches"] += 1
+            self.counters["forwarded"] += len(updates)
+
+    def forward(self, state: BotState, dirty: Dict[Tuple[str, str], Tuple[float, str]]) -> None:
+        batches: List[List[Update]] = [[] for _ in range(len(self))]
+        for (source, key), (ts, kind) in dirty.items():
+            if source == "polymarket":
+                event = state.polymarket_data.get(key)
+                for batch in batches:
+                    batch.append((source, key, ts, kind if event is not None else "remove", event))
+                continue
+            match = state.pinnacle_data.get(key)
+            previous = self._owner.get(key)
+            if match is None:
+                self._owner.pop(key, None)
+                if previous is not None:
+                    batches[previous].append((source, key, ts, "remove", None))
+                continue
+            owner = shard_of(match, len(self), self.shard_by)
+            self._owner[key] = owner
+            if previous is not None and previous != owner:
+                # The sport changed: hand the match over.
+                batches[previous].append((source, key, ts, "remove", None))
+            batches[owner].append((source, key, ts, kind, match))
+        for index, batch in enumerate(batches):
+            self._send(index, batch)
+
+    def check_alive(self, state: BotState) -> None:
+        for index, process in enumerate(self._processes):
+            if process is not None and not process.is_alive():
+                logger.error("Strategy worker %s exited (code %s); restarting.", index, process.exitcode)
+                self.counters["restarts"] += 1
+                # The dead reader may have held the queue's lock: give its successor a fresh one.
+                self._inboxes[index] = self._context.Queue()
+                self._spawn(index, state)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for inbox in self._inboxes:
+            inbox.put(None)
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self),
+            "shard_by": self.shard_by,
+            "owned": [sum(1 for owner in self._owner.values() if owner == index) for index in range(len(self))],
+            **self.counters,
+            "shards": dict(self.reports),
+        }
+
+
+def _get_result(outbox) -> Optional[tuple]:
+    try:
+        return outbox.get(timeout=_RESULT_POLL_SEC)
+    except queue.Empty:
+        return None
+
+
+async def _handle_results(state: BotState, shards: StrategyShards) -> None:
+    """Single executor for every worker's intents; also relays approvals and metrics."""
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await loop.run_in_executor(None, _get_result, shards.outbox)
+        if message is None:
+            continue
+        kind, index = message[0], message[1]
+        if kind == "intents":
+            shards.counters["intents"] += len(message[2])
+            await strategy.execute_trade_intents(state, message[2])
+        elif kind == "pending":
+            shards.counters["pending"] += 1
+            matching.match_approver.enqueue_pending(message[2])
+        elif kind == "odds":
+            if state.odds_table is not None:
+                state.odds_table.apply(message[2])
+        elif kind == "report":
+            shards.reports[index] = message[2]
+            for event_id, until in message[3].items():
+                if until > state.hot_events.get(event_id, 0.0):
+                    state.hot_events[event_id] = until
+            state.strategy_metrics.update(shards.stats(), orders=trading.ORDER_LATENCY.as_dict())
+
+
+async def _collect_changes(state: BotState, timeout: float) -> Dict[Tuple[str, str], Tuple[float, str]]:
+    """Wait up to ``timeout`` for change notifications and drain everything queued."""
+    changes: Dict[Tuple[str, str], Tuple[float, str]] = {}
+    dirty_queue = state.dirty_queue
+    if dirty_queue.empty():
+        try:
+            source, key, ts, kind = await asyncio.wait_for(dirty_queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return changes
+        changes[(source, key)] = (ts, kind)
+    while not dirty_queue.empty():
+        source, key, ts, kind = dirty_queue.get_nowait()
+        previous = changes.get((source, key))
+        # Keep the oldest timestamp so latency reflects the first unseen change.
+        changes[(source, key)] = (previous[0] if previous else ts, kind)
+    return changes
+
+
+async def run_sharded_strategy(
+    state: BotState,
+    workers: Optional[int] = None,
+    shard_by: Optional[str] = None,
+    initializer: Optional[Callable[[], None]] = None,
+) -> None:
+    """Forward ingestion updates to strategy workers and execute the intents they send back."""
+    shards = StrategyShards(
+        workers if workers is not None else config.settings.strategy_workers,
+        shard_by if shard_by is not None else config.settings.strategy_shard_by,
+        initializer,
+    )
+    # Changes queued so far are covered by the seed every worker starts with.
+    while not state.dirty_queue.empty():
+        state.dirty_queue.get_nowait()
+    shards.start(state)
+    logger.info("Strategy sharded across %s worker processes by %s.", len(shards), shards.shard_by)
+    results = asyncio.create_task(_handle_results(state, shards))
+    try:
+        while True:
+            changes = await _collect_changes(state, timeout=1.0)
+            if changes:
+                shards.forward(state, changes)
+            shards.check_alive(state)
+    finally:
+        results.cancel()
+        await asyncio.gather(results, return_exceptions=True)
+        shards.stop()
@@ -2,25 +2,41 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Deque, Dict, List, Set
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers only
     from .matching import MatchCandidate
+    from .records import PinnacleMatch, PolymarketEvent
 
 
 @dataclass
 class BotState:
-    pinnacle_data: Dict[str, dict] = field(default_factory=dict)
-    polymarket_data: Dict[str, dict] = field(default_factory=dict)
+    pinnacle_data: Dict[str, 'PinnacleMatch'] = field(default_factory=dict)
+    polymarket_data: Dict[str, 'PolymarketEvent'] = field(default_factory=dict)
     pinnacle_history: Deque[dict] = field(default_factory=lambda: deque(maxlen=500))
-    polymarket_history: Deque[dict] = field(default_factory=lambda: deque(maxlen=500))
+    # Trimmed by age in ``data_sources`` (shards append independently, so a count cap would
+    # cut into the post-trade log window).
+    polymarket_history: Deque[dict] = field(default_factory=deque)
     recent_trades: Dict[str, List[dict]] = field(default_factory=lambda: defaultdict(list))
     background_tasks: Set[Any] = field(default_factory=set)
     clob_client: Any | None = None
     approval_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
     pending_candidates: Dict[str, 'MatchCandidate'] = field(default_factory=dict)
+    dirty_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    strategy_metrics: Dict[str, Any] = field(default_factory=dict)
+    polymarket_poll_stats: Dict[str, Any] = field(default_factory=dict)
+    hot_tokens: Dict[str, float] = field(default_factory=dict)
+    # Polymarket event id -> monotonic time until which it counts as near-arb.
+    hot_events: Dict[str, float] = field(default_factory=dict)
+    # ``odds_table.OddsTable`` when ODDS_TABLE_ROWS > 0 (``OddsTableForwarder`` in strategy workers).
+    odds_table: Any | None = None
+
+    def mark_dirty(self, source: str, key: str, kind: str = "update") -> None:
+        """Tell the strategy that a Pinnacle match or Polymarket event was added, updated or removed."""
+        self.dirty_queue.put_nowait((source, key, time.monotonic(), kind))
 
 
 state = BotState()
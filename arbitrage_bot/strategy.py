@@ -2,19 +2,30 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import time
-from typing import Dict, Iterable, List, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from loguru import logger
 from thefuzz import fuzz
 
 from . import config
 from .logging_utils import log_opportunity_change
-from .matching import MatchCandidate, match_approver, normalize_title
-from .orderbook import fetch_order_book, summarize_liquidity_to_price
+from .matching import MatchCandidate, match_approver, match_index, normalize_title
+from .metrics import LatencyStats
+from .orderbook import (
+    ParsedBook,
+    ServedBook,
+    book_version,
+    served_book,
+    start_order_books,
+    summarize_liquidity_to_price,
+    watch_tokens,
+)
+from .records import PARSE_STATS, PinnacleMatch, PolymarketEvent, PolymarketMarket
 from .state import BotState
-from .trading import check_trade_cooldown, place_polymarket_trade, register_paper_position
+from .trading import ORDER_LATENCY, check_trade_cooldown, place_polymarket_trade, register_paper_position
 
 
 def calculate_decimal_odds(price: Optional[float]) -> Optional[float]:
@@ -29,111 +40,105 @@ def calculate_decimal_odds(price: Optional[float]) -> Optional[float]:
     return None
 
 
-def find_polymarket_moneyline_market(polymarket_event: dict) -> Optional[dict]:
-    markets = polymarket_event.get("markets", [])
-    title = polymarket_event.get("title")
+def _detect_moneyline_market(polymarket_event: PolymarketEvent) -> Optional[int]:
+    """Position of the event's moneyline market, or ``None``."""
+    markets = polymarket_event.markets
+    title = polymarket_event.title
 
-    for market in markets:
-        if market.get("sportsMarketType") == "moneyline":
+    for index, market in enumerate(markets):
+        if market.sports_market_type == "moneyline":
             logger.trace("Found explicit moneyline market for '%s'", title)
-            return market
+            return index
 
     best_score = 0
-    best_market = None
-    for market in markets:
-        question = market.get("question") or ""
-        try:
-            outcomes = json.loads(market.get("outcomes", "[]"))
-        except Exception:
-            outcomes = []
-        if len(outcomes) not in (2, 3):
+    best_index = None
+    for index, market in enumerate(markets):
+        if len(market.outcomes) not in (2, 3):
             continue
-        score = fuzz.ratio(normalize_title(title), normalize_title(question))
+        score = fuzz.ratio(normalize_title(title), normalize_title(market.question_lower))
         if score > best_score:
             best_score = score
-            best_market = market
-    if best_market and best_score > 95:
+            best_index = index
+    if best_index is not None and best_score > 95:
         logger.trace("Fuzzy-identified moneyline market for '%s' (score %s)", title, best_score)
-        return best_market
+        return best_index
     return None
 
 
-def build_moneyline_from_binary_markets(polymarket_event: dict, home_name: str, away_name: str) -> Dict[str, dict]:
-    results: Dict[str, dict] = {}
-    home_l = (home_name or "").lower()
-    away_l = (away_name or "").lower()
+class MoneylineCache:
+    """Detected moneyline market position per Polymarket event, keyed by its ``markets_version``.
 
-    for market in polymarket_event.get("markets", []):
-        try:
-            if not market.get("active") or market.get("closed"):
-                continue
-            if not market.get("enableOrderBook", True):
-                continue
+    Price and score updates keep the version, so detection (and its fuzzy fallback for
+    events without an explicit ``sportsMarketType``) reruns only when the market set changes.
+    """
 
-            ql = (market.get("question") or "").lower()
-            gil = (market.get("groupItemTitle") or "").lower()
-
-            key = None
-            if "draw" in ql or "draw" in gil:
-                key = "draw"
-            elif home_l and (home_l in ql or home_l == gil) and ("win" in ql or home_l == gil):
-                key = "home"
-            elif away_l and (away_l in ql or away_l == gil) and ("win" in ql or away_l == gil):
-                key = "away"
-            if not key:
-                continue
+    def __init__(self) -> None:
+        self._entries: Dict[str, tuple[int, Optional[int]]] = {}
+        self.hits = 0
+        self.misses = 0
 
-            try:
-                prices = json.loads(market.get("outcomePrices", "[]"))
-            except Exception:
-                try:
-                    prices = json.loads(market.get("prices", "[]"))
-                except Exception:
-                    prices = []
-            try:
-                tokens = json.loads(market.get("clobTokenIds", "[]"))
-            except Exception:
-                tokens = []
-            if not prices:
-                continue
+    def position(self, polymarket_event: PolymarketEvent) -> Optional[int]:
+        entry = self._entries.get(polymarket_event.event_id)
+        if entry is not None and entry[0] == polymarket_event.markets_version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        index = _detect_moneyline_market(polymarket_event)
+        self._entries[polymarket_event.event_id] = (polymarket_event.markets_version, index)
+        return index
 
-            p_yes = float(prices[0])
-            if not (0.001 <= p_yes <= 0.999):
-                continue
+    def get(self, polymarket_event: PolymarketEvent) -> Optional[PolymarketMarket]:
+        index = self.position(polymarket_event)
+        return polymarket_event.markets[index] if index is not None else None
 
-            token_id = tokens[0] if tokens else None
-            liquidity = float(market.get("liquidityNum", 0) or 0.0)
+    def prune(self, event_ids: Iterable[str]) -> None:
+        alive = set(event_ids)
+        for event_id in [event_id for event_id in self._entries if event_id not in alive]:
+            del self._entries[event_id]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+MONEYLINE_CACHE = MoneylineCache()
 
-            results[key] = {
-                "market": market,
-                "p_yes": p_yes,
-                "token_id": token_id,
-                "liquidity": liquidity,
-            }
-        except Exception:
-            continue
 
-    return results
+def find_polymarket_moneyline_market(polymarket_event: PolymarketEvent) -> Optional[PolymarketMarket]:
+    return MONEYLINE_CACHE.get(polymarket_event)
 
 
-def create_test_pinnacle_event(polymarket_event: dict) -> Optional[dict]:
+def _binary_market_side(market: PolymarketMarket, home_l: str, away_l: str) -> Optional[str]:
+    """Which moneyline side (home/draw/away) a Yes/No market prices, from its question."""
+    ql = market.question_lower
+    gil = market.group_item_title_lower
+    if "draw" in ql or "draw" in gil:
+        return "draw"
+    if home_l and (home_l in ql or home_l == gil) and ("win" in ql or home_l == gil):
+        return "home"
+    if away_l and (away_l in ql or away_l == gil) and ("win" in ql or away_l == gil):
+        return "away"
+    return None
+
+
+def _binary_market_tradable(market: PolymarketMarket) -> bool:
+    return market.active and not market.closed and market.enable_order_book
+
+
+def create_test_pinnacle_event(polymarket_event: PolymarketEvent) -> Optional[dict]:
     try:
         moneyline_market = find_polymarket_moneyline_market(polymarket_event)
         if not moneyline_market:
             return None
 
-        outcomes = json.loads(moneyline_market.get("outcomes", "[]"))
-        prices = json.loads(moneyline_market.get("prices", "[]")) or json.loads(
-            moneyline_market.get("outcomePrices", "[]") or "[]"
-        )
+        outcomes = moneyline_market.outcomes
+        prices = moneyline_market.prices
         if len(outcomes) < 2 or len(prices) < 2:
             return None
 
         target_price = None
         target_outcome = None
-        for name, price in zip(outcomes, prices):
-            price_float = float(price)
-            if 0.001 <= price_float <= 0.999:
+        for name, price_float in zip(outcomes, prices):
+            if price_float is not None and 0.001 <= price_float <= 0.999:
                 target_price = price_float
                 target_outcome = name
                 break
@@ -151,10 +156,10 @@ def create_test_pinnacle_event(polymarket_event: dict) -> Optional[dict]:
         elif target_outcome == away_name:
             win2 = test_pinnacle_odd
 
-        match_id = f"test_{polymarket_event.get('id', int(time.time()))}"
+        match_id = f"test_{polymarket_event.event_id or int(time.time())}"
         return {
-            "Pid": int(f"999{polymarket_event['id']}") if polymarket_event.get("id") else int(time.time()),
-            "LeagueName": polymarket_event.get("series", [{}])[0].get("title", "Test League"),
+            "Pid": int(f"999{polymarket_event.event_id}") if polymarket_event.event_id else int(time.time()),
+            "LeagueName": polymarket_event.series_title or "Test League",
             "homeName": home_name,
             "awayName": away_name,
             "MatchId": match_id,
@@ -177,8 +182,235 @@ def create_test_pinnacle_event(polymarket_event: dict) -> Optional[dict]:
         return None
 
 
-async def run_strategy(state: BotState) -> None:
+@dataclass
+class TickMetrics:
+    """Timings and counters collected for a single strategy tick."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    queue_depth: int = 0
+    dirty_keys: int = 0
+    changes: Dict[str, int] = field(default_factory=dict)
+    matches_evaluated: int = 0
+    books_requested: int = 0
+    books_warm: int = 0
+    parse_calls: int = 0
+    comparisons: int = 0
+    evaluated: int = 0
+    evaluations_skipped: int = 0
+    depth_checks: int = 0
+    deadline_misses: int = 0
+    full_sweep: bool = False
+    dirty_to_eval_ms: List[float] = field(default_factory=list)
+    stages: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - started) * 1000.0
+
+    def as_dict(self) -> dict:
+        latencies = self.dirty_to_eval_ms
+        return {
+            "queue_depth": self.queue_depth,
+            "dirty_keys": self.dirty_keys,
+            "changes": dict(self.changes),
+            "matches_evaluated": self.matches_evaluated,
+            "books_requested": self.books_requested,
+            "books_warm": self.books_warm,
+            "parse_calls": self.parse_calls,
+            "comparisons": self.comparisons,
+            "evaluated": self.evaluated,
+            "evaluations_skipped": self.evaluations_skipped,
+            "depth_checks": self.depth_checks,
+            "deadline_misses": self.deadline_misses,
+            "full_sweep": self.full_sweep,
+            "dirty_to_eval_ms_avg": (sum(latencies) / len(latencies)) if latencies else None,
+            "dirty_to_eval_ms_max": max(latencies) if latencies else None,
+            "tick_ms": (time.perf_counter() - self.started_at) * 1000.0,
+            "stages_ms": dict(self.stages),
+        }
+
+
+@dataclass
+class OutcomeQuote:
+    """One Pinnacle outcome paired with its Polymarket price, pending evaluation."""
+
+    pin_event_id: str
+    pin_title: str
+    pm_event: PolymarketEvent
+    outcome_label: str
+    # Pinnacle's name for the outcome (the odds-table key); ``outcome_label`` may be Polymarket's.
+    pin_outcome: str
+    o_pin: Optional[float]
+    o_pm: Optional[float]
+    polymarket_price: Optional[float]
+    token_id: Optional[str]
+    liquidity: float
+    market_id: Optional[str]
+    # Filled for the whole tick by ``_price_quotes``.
+    ratio: Optional[float] = None
+    edge_pct: Optional[float] = None
+    threshold_price: Optional[float] = None
+    needs_depth: bool = True
+
+    def is_priced(self) -> bool:
+        return bool(self.o_pin and self.o_pm and self.polymarket_price is not None)
+
+
+@dataclass(frozen=True, slots=True)
+class TradeIntent:
+    """An outcome at or above ``ARB_RATIO``, waiting for the tick's cooldown and order pass."""
+
+    quote: OutcomeQuote
+    cooldown_key: str
+    avail_shares_at_th: Optional[float]
+    avail_usd_at_th: Optional[float]
+    wavg_price_at_th: Optional[float]
+    book_age_ms: Optional[float]
+
+    def order_key(self) -> tuple:
+        return (self.cooldown_key, self.quote.pin_event_id, self.quote.outcome_label)
+
+
+# Receives each tick's intents, already in execution order.
+IntentExecutor = Callable[[List[TradeIntent]], Awaitable[None]]
+
+
+def _price_quotes(quotes: Sequence[OutcomeQuote], margin: float) -> int:
+    """Compute ratio, edge and threshold price for every priced quote of the tick in one pass.
+
+    Only quotes within ``margin`` of ``ARB_RATIO`` need order-book depth; returns their count.
+    """
+    arb_ratio = config.ARB_RATIO
+    # A negative margin counts as zero, so the floor never rises above ARB_RATIO and every
+    # quote that could trade still gets its depth checked.
+    depth_floor = arb_ratio - max(margin, 0.0)
+    o_pins = [quote.o_pin for quote in quotes]
+    ratios = [quote.o_pm / o_pin for quote, o_pin in zip(quotes, o_pins)]
+    thresholds = [1.0 / (o_pin * arb_ratio) for o_pin in o_pins]
+    needs_depth = 0
+    for quote, ratio, threshold_price in zip(quotes, ratios, thresholds):
+        quote.ratio = ratio
+        quote.edge_pct = (ratio - 1.0) * 100.0
+        quote.threshold_price = threshold_price
+        quote.needs_depth = ratio >= depth_floor
+        needs_depth += quote.needs_depth
+    return needs_depth
+
+
+def _quote_fingerprint(quote: OutcomeQuote, version: Optional[tuple]) -> tuple:
+    return (quote.o_pin, quote.polymarket_price, quote.token_id, version)
+
+
+class EvaluationMemo:
+    """Input fingerprint of the last evaluation per (Pinnacle match, outcome).
+
+    A quote whose Pinnacle odds, Polymarket price, token and book version match the
+    last evaluation can only reproduce a ``scan`` row that ``log_opportunity_change``
+    drops, so it is skipped together with its book fetch. Quotes at or above
+    ``ARB_RATIO`` are always evaluated (trades and cooldowns depend on time), and every
+    quote is re-evaluated at least every ``max_age_sec``.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[tuple[str, str], tuple[tuple, float]] = {}
+        self.evaluated = 0
+        self.skipped = 0
+
+    def is_unchanged(self, quote: OutcomeQuote, fingerprint: tuple, now: float, max_age_sec: float) -> bool:
+        entry = self._entries.get((quote.pin_event_id, quote.outcome_label))
+        if entry is None or entry[0] != fingerprint or now - entry[1] > max_age_sec:
+            return False
+        return quote.o_pm / quote.o_pin < config.ARB_RATIO
+
+    def record(self, quote: OutcomeQuote, fingerprint: tuple, now: float) -> None:
+        self._entries[(quote.pin_event_id, quote.outcome_label)] = (fingerprint, now)
+
+    def prune(self, pin_event_ids: Iterable[str]) -> None:
+        alive = set(pin_event_ids)
+        for key in [key for key in self._entries if key[0] not in alive]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "evaluated": self.evaluated, "skipped": self.skipped}
+
+
+EVALUATION_MEMO = EvaluationMemo()
+# Wall time of recent strategy ticks, for p50/p99 in the metrics snapshot.
+TICK_LATENCY = LatencyStats()
+
+
+def _mark_hot(state: BotState, quote: OutcomeQuote, ratio: Optional[float]) -> None:
+    if quote.token_id and ratio and ratio >= config.ARB_RATIO - config.settings.hot_ratio_band:
+        hold_until = time.monotonic() + config.settings.hot_token_hold_sec
+        state.hot_tokens[quote.token_id] = hold_until
+        state.hot_events[quote.pm_event.event_id] = hold_until
+
+
+async def _collect_dirty(
+    state: BotState, timeout: float, changes: Dict[str, int]
+) -> Dict[tuple[str, str], float]:
+    """Wait up to ``timeout`` for change notifications and drain everything queued.
+
+    Notification kinds (add/update/remove) are counted into ``changes``.
+    """
+    dirty: Dict[tuple[str, str], float] = {}
+    queue = state.dirty_queue
+    if queue.empty():
+        try:
+            source, key, ts, kind = await asyncio.wait_for(queue.get(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            return dirty
+        dirty[(source, key)] = ts
+        changes[kind] = changes.get(kind, 0) + 1
+    while not queue.empty():
+        source, key, ts, kind = queue.get_nowait()
+        # Keep the oldest timestamp so latency reflects the first unseen change.
+        dirty.setdefault((source, key), ts)
+        changes[kind] = changes.get(kind, 0) + 1
+    return dirty
+
+
+def _affected_pinnacle_ids(
+    dirty: Iterable[tuple[str, str]], pinnacle_ids: Iterable[str], titles_changed: bool
+) -> Set[str]:
+    affected: Set[str] = set()
+    for source, key in dirty:
+        if source == "pinnacle":
+            affected.add(key)
+        else:
+            # Updated or removed event: re-evaluate (and, if removed, re-pair) its matches.
+            affected.update(match_index.matches_for(key))
+    if titles_changed:
+        # A new or renamed Polymarket event may pair with any match not confirmed yet.
+        affected.update(pid for pid in pinnacle_ids if not match_index.is_paired(pid))
+    return affected
+
+
+async def run_strategy(state: BotState, execute: Optional[IntentExecutor] = None) -> None:
+    """Evaluate dirty matches as they change; ``execute`` receives each tick's trade intents in order.
+
+    By default intents are executed in this process (``execute_trade_intents``); strategy
+    workers (see ``sharding``) pass a callable that forwards them to the main process.
+    """
+    if execute is None:
+        async def execute(intents: List[TradeIntent]) -> None:
+            await execute_trade_intents(state, intents)
+
+    sweep_interval = max(config.settings.strategy_sweep_interval_sec, 0.1)
+    last_sweep = 0.0
+    ticks = 0
+
     while True:
+        timeout = last_sweep + sweep_interval - time.monotonic()
+        changes: Dict[str, int] = {}
+        dirty = await _collect_dirty(state, timeout, changes)
+
+        metrics = TickMetrics(queue_depth=len(dirty), dirty_keys=len({key for _, key in dirty}), changes=changes)
+        metrics.full_sweep = time.monotonic() - last_sweep >= sweep_interval
         current_pinnacle = dict(state.pinnacle_data)
 
         if config.settings.test_mode and state.polymarket_data:
@@ -186,191 +418,443 @@ async def run_strategy(state: BotState) -> None:
             for pm_event in state.polymarket_data.values():
                 test_event = create_test_pinnacle_event(pm_event)
                 if test_event:
-                    current_pinnacle[test_event["MatchId"]] = test_event
+                    current_pinnacle[test_event["MatchId"]] = PinnacleMatch.from_frame(test_event)
+                    dirty.setdefault(("pinnacle", test_event["MatchId"]), time.monotonic())
                     break
 
-        logger.info(
-            "Strategy tick: %s Pinnacle events vs %s Polymarket events",
-            len(current_pinnacle),
-            len(state.polymarket_data),
-        )
-
-        for pin_event_id, pin_event in current_pinnacle.items():
-            pin_title = pin_event.get("match")
-            if not pin_title:
-                continue
-
-            pm_event, score = _find_and_confirm_match(pin_title, state.polymarket_data.values())
-            if not pm_event:
-                continue
-
-            pin_odds_list = _extract_pinnacle_odds(pin_event)
-            if not pin_odds_list:
-                continue
-
-            moneyline_market = find_polymarket_moneyline_market(pm_event)
-            if moneyline_market:
-                await _process_moneyline_market(state, pin_event_id, pin_title, pin_odds_list, pm_event, moneyline_market)
-            else:
-                await _process_binary_markets(state, pin_event_id, pin_title, pin_odds_list, pm_event)
-
-        await asyncio.sleep(2)
-
-
-def _find_and_confirm_match(pin_title: str, polymarket_events: Iterable[dict]) -> tuple[Optional[dict], int]:
-    best_event = None
-    best_score = 0
-    for event in polymarket_events:
-        score = fuzz.token_sort_ratio(normalize_title(pin_title), normalize_title(event.get("title")))
-        if score > best_score:
-            best_score = score
-            best_event = event
+        titles_changed = False
+        for source, key in dirty:
+            if source == "polymarket":
+                titles_changed = match_index.observe_event(key, state.polymarket_data.get(key)) or titles_changed
+
+        if metrics.full_sweep:
+            last_sweep = time.monotonic()
+            match_index.sync(state.polymarket_data)
+            match_index.prune(current_pinnacle)
+            MONEYLINE_CACHE.prune(state.polymarket_data)
+            OUTCOME_MAPPINGS.prune(current_pinnacle)
+            EVALUATION_MEMO.prune(current_pinnacle)
+            targets = list(current_pinnacle)
+            logger.info(
+                "Strategy sweep: %s Pinnacle events vs %s Polymarket events",
+                len(current_pinnacle),
+                len(state.polymarket_data),
+            )
+        else:
+            affected = _affected_pinnacle_ids(dirty, current_pinnacle, titles_changed)
+            targets = [pid for pid in current_pinnacle if pid in affected]
+
+        dirty_since = {key: ts for (source, key), ts in dirty.items() if source == "pinnacle"}
+        quotes: List[OutcomeQuote] = []
+        parses_before = PARSE_STATS["json_lists"]
+        comparisons_before = match_index.comparisons
+        with metrics.stage("match"):
+            # Score every new or retitled match in one batch; per-match lookups then hit the index.
+            match_index.resolve({pid: current_pinnacle[pid].title for pid in targets})
+        for pin_event_id in targets:
+            pin_event = current_pinnacle[pin_event_id]
+            try:
+                quotes.extend(_collect_pinnacle_quotes(state, pin_event_id, pin_event, metrics))
+            except Exception as exc:
+                logger.error("Strategy error for %s: %s", pin_event_id, exc)
+            metrics.matches_evaluated += 1
+        metrics.parse_calls = PARSE_STATS["json_lists"] - parses_before
+        metrics.comparisons = match_index.comparisons - comparisons_before
+
+        with metrics.stage("fingerprint"):
+            now = time.monotonic()
+            max_age = config.settings.strategy_reevaluate_max_age_sec
+            pending: List[OutcomeQuote] = []
+            for quote in quotes:
+                if not quote.is_priced():
+                    continue
+                version = book_version(quote.token_id) if quote.token_id else None
+                if EVALUATION_MEMO.is_unchanged(quote, _quote_fingerprint(quote, version), now, max_age):
+                    # Nothing to re-log, but keep a near-threshold token warm.
+                    _mark_hot(state, quote, quote.o_pm / quote.o_pin)
+                    metrics.evaluations_skipped += 1
+                else:
+                    pending.append(quote)
+            metrics.evaluated = len(pending)
+            EVALUATION_MEMO.skipped += metrics.evaluations_skipped
+            EVALUATION_MEMO.evaluated += metrics.evaluated
+
+        with metrics.stage("prefilter"):
+            metrics.depth_checks = _price_quotes(pending, config.settings.depth_ratio_margin)
+
+        with metrics.stage("evaluate"):
+            # Outcomes far below the threshold are logged without depth, so their books are not needed.
+            watch_tokens({quote.token_id for quote in pending if quote.token_id and quote.needs_depth})
+            intents = await _evaluate_matches(state, pending, metrics, now)
+
+        with metrics.stage("trades"):
+            # Cooldowns and orders are decided one at a time in a fixed order, whichever match finished first.
+            intents.sort(key=TradeIntent.order_key)
+            if intents:
+                await execute(intents)
+
+        evaluated_at = time.monotonic()
+        for pin_event_id in targets:
+            since = dirty_since.get(pin_event_id)
+            if since is not None:
+                metrics.dirty_to_eval_ms.append((evaluated_at - since) * 1000.0)
+
+        ticks += 1
+        snapshot = metrics.as_dict()
+        TICK_LATENCY.observe(snapshot["tick_ms"] / 1000.0)
+        snapshot["ticks"] = ticks
+        snapshot["tick_latency"] = TICK_LATENCY.as_dict()
+        snapshot["moneyline_cache"] = MONEYLINE_CACHE.stats()
+        snapshot["outcome_mappings"] = OUTCOME_MAPPINGS.stats()
+        snapshot["evaluation_memo"] = EVALUATION_MEMO.stats()
+        snapshot["orders"] = ORDER_LATENCY.as_dict()
+        snapshot["title_cache"] = normalize_title.cache_info()._asdict()
+        if state.odds_table is not None:
+            snapshot["odds_table"] = state.odds_table.stats()
+        state.strategy_metrics.update(snapshot)
+        logger.debug("Strategy tick metrics: %s", snapshot)
+
+
+def _collect_pinnacle_quotes(
+    state: BotState,
+    pin_event_id: str,
+    pin_event: PinnacleMatch,
+    metrics: TickMetrics,
+) -> List[OutcomeQuote]:
+    pin_title = pin_event.title
+
+    with metrics.stage("match"):
+        pm_event, score = _find_and_confirm_match(pin_event_id, pin_title, state.polymarket_data)
+    if not pm_event:
+        match_index.unpair(pin_event_id)
+        if state.odds_table is not None:
+            state.odds_table.release(pin_event_id)
+        return []
+    if match_index.pair(pin_event_id, pm_event.event_id):
+        logger.info("Match confirmed: '%s' ↔ '%s' (score %s)", pin_title, pm_event.title, score)
+        if state.odds_table is not None:
+            # Rows published for a previous pair belong to that event's tokens.
+            state.odds_table.release(pin_event_id)
+
+    if not pin_event.odds:
+        return []
+
+    with metrics.stage("mapping"):
+        mapping = OUTCOME_MAPPINGS.get(pin_event_id, pin_event, pm_event)
+    with metrics.stage("markets"):
+        return _quotes_from_mapping(pin_event_id, pin_event, pm_event, mapping)
+
+
+def _find_and_confirm_match(
+    pin_event_id: str, pin_title: str, polymarket_events: Dict[str, PolymarketEvent]
+) -> tuple[Optional[PolymarketEvent], int]:
+    best_id, best_score = match_index.best_candidate(pin_event_id, pin_title)
+    best_event = polymarket_events.get(best_id) if best_id else None
     if not best_event or best_score < 70:
         return None, best_score
 
     candidate = MatchCandidate(
         pinnacle_title=pin_title,
-        polymarket_title=best_event.get("title", ""),
-        polymarket_id=best_event.get("id", ""),
+        polymarket_title=best_event.title,
+        polymarket_id=best_event.event_id,
         score=best_score,
     )
     if not match_approver.is_approved(candidate):
         return None, best_score
-    logger.info("Match confirmed: '%s' ↔ '%s' (score %s)", pin_title, best_event.get("title"), best_score)
     return best_event, best_score
 
 
-def _extract_pinnacle_odds(pin_event: dict) -> List[dict]:
-    results: List[dict] = []
-    periods = pin_event.get("Periods")
-    if not periods or not isinstance(periods, list):
-        return results
-    first_period = periods[0] or {}
-    win1x2 = first_period.get("Win1x2") if isinstance(first_period, dict) else None
-    if not isinstance(win1x2, dict):
-        return results
+@dataclass(frozen=True, slots=True)
+class MappedOutcome:
+    """One Pinnacle outcome resolved to its Polymarket market(s) and outcome index."""
+
+    label: str
+    pin_index: int
+    # Moneyline: the one market. Binary: every market priced as this side, in event order;
+    # the side is quoted from the last one that is tradable with 0.001 <= p_yes <= 0.999.
+    market_indices: Tuple[int, ...]
+    outcome_index: int
+
+
+@dataclass(frozen=True, slots=True)
+class OutcomeMapping:
+    """Resolved Pinnacle outcome → Polymarket market/outcome mapping for one confirmed pair."""
+
+    pm_event_id: str
+    markets_version: int
+    pin_key: tuple
+    moneyline: bool
+    outcomes: Tuple[MappedOutcome, ...]
+
+
+def _pin_mapping_key(pin_event: PinnacleMatch) -> tuple:
+    return (pin_event.home, pin_event.away, tuple(odds.name for odds in pin_event.odds))
+
+
+def _build_outcome_mapping(pin_event: PinnacleMatch, pm_event: PolymarketEvent) -> OutcomeMapping:
+    pin_odds_list = pin_event.odds
+    outcomes: List[MappedOutcome] = []
+    moneyline_index = MONEYLINE_CACHE.position(pm_event)
+    if moneyline_index is not None:
+        market = pm_event.markets[moneyline_index]
+        for idx, outcome_name in enumerate(market.outcomes):
+            outcome_lower = outcome_name.lower()
+            pin_index = next(
+                (i for i, o in enumerate(pin_odds_list) if outcome_name and o.name_lower in outcome_lower),
+                None,
+            )
+            if pin_index is not None:
+                outcomes.append(MappedOutcome(outcome_name, pin_index, (moneyline_index,), idx))
+    elif pin_event.home and pin_event.away:
+        home_l = pin_event.home.lower()
+        away_l = pin_event.away.lower()
+        sides: Dict[str, List[int]] = {"home": [], "draw": [], "away": []}
+        for index, market in enumerate(pm_event.markets):
+            side = _binary_market_side(market, home_l, away_l)
+            if side:
+                sides[side].append(index)
+        for side, label in (("home", pin_event.home), ("draw", "Draw"), ("away", pin_event.away)):
+            pin_index = next((i for i, o in enumerate(pin_odds_list) if o.name == label), None)
+            if pin_index is not None and sides[side]:
+                outcomes.append(MappedOutcome(label, pin_index, tuple(sides[side]), 0))
+    return OutcomeMapping(
+        pm_event_id=pm_event.event_id,
+        markets_version=pm_event.markets_version,
+        pin_key=_pin_mapping_key(pin_event),
+        moneyline=moneyline_index is not None,
+        outcomes=tuple(outcomes),
+    )
 
-    home_name = pin_event.get("homeName")
-    away_name = pin_event.get("awayName")
 
-    if home_name and win1x2.get("Win1", {}).get("value"):
-        results.append({"name": home_name, "price": win1x2["Win1"]["value"]})
-    if away_name and win1x2.get("Win2", {}).get("value"):
-        results.append({"name": away_name, "price": win1x2["Win2"]["value"]})
-    if win1x2.get("WinNone", {}).get("value"):
-        results.append({"name": "Draw", "price": win1x2["WinNone"]["value"]})
-    return results
+class OutcomeMappingCache:
+    """``OutcomeMapping`` per Pinnacle match, rebuilt only when either side's market set changes.
 
+    Valid while the match is paired with the same Polymarket event, that event's
+    ``markets_version`` is unchanged and the Pinnacle teams and priced outcomes are the same.
+    """
 
-async def _process_moneyline_market(
-    state: BotState,
-    pin_event_id: str,
-    pin_title: str,
-    pin_odds_list: List[dict],
-    pm_event: dict,
-    market: dict,
-) -> None:
-    try:
-        outcomes = json.loads(market.get("outcomes", "[]"))
-        prices = json.loads(market.get("outcomePrices", "[]"))
-        tokens = json.loads(market.get("clobTokenIds", "[]"))
-    except Exception:
-        return
+    def __init__(self) -> None:
+        self._entries: Dict[str, OutcomeMapping] = {}
+        self.hits = 0
+        self.misses = 0
 
-    for idx, outcome_name in enumerate(outcomes):
-        pin_outcome = next(
-            (
-                o
-                for o in pin_odds_list
-                if outcome_name and o.get("name", "").lower() in outcome_name.lower()
-            ),
-            None,
-        )
-        if not pin_outcome or idx >= len(prices):
-            continue
+    def get(self, pin_event_id: str, pin_event: PinnacleMatch, pm_event: PolymarketEvent) -> OutcomeMapping:
+        mapping = self._entries.get(pin_event_id)
+        if (
+            mapping is not None
+            and mapping.pm_event_id == pm_event.event_id
+            and mapping.markets_version == pm_event.markets_version
+            and mapping.pin_key == _pin_mapping_key(pin_event)
+        ):
+            self.hits += 1
+            return mapping
+        self.misses += 1
+        mapping = _build_outcome_mapping(pin_event, pm_event)
+        self._entries[pin_event_id] = mapping
+        return mapping
 
-        try:
-            polymarket_price = float(prices[idx])
-        except Exception:
-            polymarket_price = None
-        o_pm = calculate_decimal_odds(polymarket_price)
-        await _evaluate_opportunity(
-            state,
-            pin_event_id,
-            pin_title,
-            pm_event,
-            outcome_name,
-            pin_outcome.get("price"),
-            o_pm,
-            polymarket_price,
-            tokens[idx] if idx < len(tokens) else None,
-            float(market.get("liquidityNum", 0) or 0.0),
-            market.get("id"),
-        )
+    def prune(self, pin_event_ids: Iterable[str]) -> None:
+        alive = set(pin_event_ids)
+        for pin_event_id in [pin_event_id for pin_event_id in self._entries if pin_event_id not in alive]:
+            del self._entries[pin_event_id]
 
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
 
-async def _process_binary_markets(
-    state: BotState,
-    pin_event_id: str,
-    pin_title: str,
-    pin_odds_list: List[dict],
-    pm_event: dict,
-) -> None:
-    home_name = pin_event.get("homeName")
-    away_name = pin_event.get("awayName")
-    if not home_name or not away_name:
-        return
 
-    assembled = build_moneyline_from_binary_markets(pm_event, home_name, away_name)
-    mapping = [
-        ("home", next((o for o in pin_odds_list if o.get("name") == home_name), None), home_name),
-        ("draw", next((o for o in pin_odds_list if o.get("name") == "Draw"), None), "Draw"),
-        ("away", next((o for o in pin_odds_list if o.get("name") == away_name), None), away_name),
-    ]
+OUTCOME_MAPPINGS = OutcomeMappingCache()
 
-    for key, pin_outcome, label in mapping:
-        if key not in assembled or not pin_outcome:
-            continue
-        data = assembled[key]
-        o_pm = calculate_decimal_odds(data.get("p_yes"))
-        await _evaluate_opportunity(
-            state,
-            pin_event_id,
-            pin_title,
-            pm_event,
-            label,
-            pin_outcome.get("price"),
-            o_pm,
-            data.get("p_yes"),
-            data.get("token_id"),
-            data.get("liquidity", 0.0),
-            data.get("market", {}).get("id"),
+
+def _quotes_from_mapping(
+    pin_event_id: str,
+    pin_event: PinnacleMatch,
+    pm_event: PolymarketEvent,
+    mapping: OutcomeMapping,
+) -> List[OutcomeQuote]:
+    quotes: List[OutcomeQuote] = []
+    markets = pm_event.markets
+    if mapping.moneyline and mapping.outcomes and not markets[mapping.outcomes[0].market_indices[0]].well_formed:
+        return quotes
+
+    for mapped in mapping.outcomes:
+        idx = mapped.outcome_index
+        if mapping.moneyline:
+            market = markets[mapped.market_indices[0]]
+            if idx >= len(market.prices):
+                continue
+            polymarket_price = market.prices[idx]
+        else:
+            market = None
+            for index in reversed(mapped.market_indices):
+                candidate = markets[index]
+                p_yes = candidate.prices[0] if candidate.prices else None
+                if _binary_market_tradable(candidate) and p_yes is not None and 0.001 <= p_yes <= 0.999:
+                    market = candidate
+                    break
+            if market is None:
+                continue
+            polymarket_price = p_yes
+
+        tokens = market.token_ids
+        quotes.append(
+            OutcomeQuote(
+                pin_event_id=pin_event_id,
+                pin_title=pin_event.title,
+                pm_event=pm_event,
+                outcome_label=mapped.label,
+                pin_outcome=pin_event.odds[mapped.pin_index].name,
+                o_pin=pin_event.odds[mapped.pin_index].price,
+                o_pm=calculate_decimal_odds(polymarket_price),
+                polymarket_price=polymarket_price,
+                token_id=tokens[idx] if idx < len(tokens) else None,
+                liquidity=market.liquidity,
+                market_id=market.market_id,
+            )
         )
+    return quotes
+
+
+def _tick_books(
+    state: BotState, quotes: Sequence[OutcomeQuote], metrics: TickMetrics
+) -> tuple[Dict[str, ServedBook], Dict[str, asyncio.Future]]:
+    """Books held now and one shared fetch for every other token the tick needs."""
+    token_ids = {quote.token_id for quote in quotes if quote.token_id and quote.needs_depth}
+    warm: Dict[str, ServedBook] = {}
+    # Streamed books are always current; hot tokens are kept warm by the refresher, so
+    # their cached copy is used instead of waiting.
+    warm_limit = config.settings.hot_book_max_age_sec
+    for token_id in token_ids:
+        served = served_book(token_id, warm_limit if token_id in state.hot_tokens else 0.0)
+        if served is not None:
+            warm[token_id] = served
+    cold = [token_id for token_id in token_ids if token_id not in warm]
+    metrics.books_warm += len(warm)
+    metrics.books_requested += len(cold)
+    return warm, (start_order_books(cold) if cold else {})
+
+
+async def _match_books(
+    quotes: Sequence[OutcomeQuote],
+    warm: Dict[str, ServedBook],
+    pending: Dict[str, asyncio.Future],
+    deadline_sec: float,
+) -> Dict[str, ServedBook]:
+    """Books for one match's quotes, with the age and version each was served at.
+
+    Waits only for this match's tokens of the tick's shared fetch and raises
+    ``asyncio.TimeoutError`` past ``deadline_sec``; the fetch keeps running and still
+    fills ``ORDERBOOK_CACHE``.
+    """
+    token_ids = {quote.token_id for quote in quotes if quote.token_id and quote.needs_depth}
+    books = {token_id: warm[token_id] for token_id in token_ids if token_id in warm}
+    waiting = [token_id for token_id in token_ids if token_id in pending]
+    if waiting:
+        # Shielded: the futures are shared with the other matches of the tick.
+        fetched = await asyncio.wait_for(
+            asyncio.shield(asyncio.gather(*(pending[token_id] for token_id in waiting))), timeout=deadline_sec
+        )
+        for token_id, book in zip(waiting, fetched):
+            if book is None:
+                continue
+            # The fetch just filled the cache (or the stream caught up): serve that copy.
+            books[token_id] = served_book(token_id) or ServedBook(book, None, None)
+    return books
 
 
-async def _evaluate_opportunity(
+async def _evaluate_match(
     state: BotState,
     pin_event_id: str,
-    pin_title: str,
-    pm_event: dict,
-    outcome_label: str,
-    o_pin: Optional[float],
-    o_pm: Optional[float],
-    polymarket_price: Optional[float],
-    token_id: Optional[str],
-    liquidity: float,
-    market_id: Optional[str],
-) -> None:
-    if not (o_pin and o_pm and polymarket_price is not None):
-        return
+    quotes: Sequence[OutcomeQuote],
+    tick_books: tuple[Dict[str, ServedBook], Dict[str, asyncio.Future]],
+    semaphore: asyncio.Semaphore,
+    metrics: TickMetrics,
+    now: float,
+) -> List[TradeIntent]:
+    async with semaphore:
+        try:
+            books = await _match_books(quotes, *tick_books, config.settings.strategy_match_deadline_sec)
+        except asyncio.TimeoutError:
+            # Leave the memo untouched and retry next tick, when the late books are cached.
+            metrics.deadline_misses += 1
+            logger.debug("Books for %s missed the match deadline; retrying next tick.", pin_event_id)
+            state.mark_dirty("pinnacle", pin_event_id, "retry")
+            return []
+
+    intents: List[TradeIntent] = []
+    for quote in quotes:
+        token_id = quote.token_id
+        served = books.get(token_id) if token_id else None
+        try:
+            if served is not None:
+                intent = _assess_opportunity(state, quote, served.book, served.age)
+            else:
+                intent = _assess_opportunity(state, quote, None)
+        except Exception as exc:
+            logger.error("Strategy error for %s / %s: %s", quote.pin_event_id, quote.outcome_label, exc)
+            continue
+        # Record the version of the book just used; quotes logged without depth record
+        # the one the next fingerprint check will see.
+        if served is not None:
+            version = served.version
+        else:
+            version = book_version(token_id) if token_id else None
+        EVALUATION_MEMO.record(quote, _quote_fingerprint(quote, version), now)
+        if intent is not None:
+            intents.append(intent)
+    return intents
+
+
+async def _evaluate_matches(
+    state: BotState, quotes: Sequence[OutcomeQuote], metrics: TickMetrics, now: float
+) -> List[TradeIntent]:
+    """One shared book fetch for the tick, then every match assessed concurrently (``STRATEGY_MATCH_CONCURRENCY``)."""
+    by_match: Dict[str, List[OutcomeQuote]] = {}
+    for quote in quotes:
+        by_match.setdefault(quote.pin_event_id, []).append(quote)
+    if not by_match:
+        return []
+    tick_books = _tick_books(state, quotes, metrics)
+    semaphore = asyncio.Semaphore(max(1, config.settings.strategy_match_concurrency))
+    results = await asyncio.gather(
+        *(
+            _evaluate_match(state, pin_event_id, match_quotes, tick_books, semaphore, metrics, now)
+            for pin_event_id, match_quotes in by_match.items()
+        )
+    )
+    return [intent for intents in results for intent in intents]
 
-    ratio = o_pm / o_pin if o_pin else None
-    edge_pct = ((ratio - 1.0) * 100.0) if ratio else None
 
-    threshold_price = 1.0 / (o_pin * config.ARB_RATIO)
+def _assess_opportunity(
+    state: BotState,
+    quote: OutcomeQuote,
+    book: Optional[ParsedBook],
+    book_age: Optional[float] = None,
+) -> Optional[TradeIntent]:
+    """Log the scan row for ``quote``; a ``TradeIntent`` when its ratio reaches ``ARB_RATIO``."""
+    if not quote.is_priced():
+        return None
+
+    pin_event_id = quote.pin_event_id
+    pin_title = quote.pin_title
+    outcome_label = quote.outcome_label
+    o_pin = quote.o_pin
+    o_pm = quote.o_pm
+    polymarket_price = quote.polymarket_price
+    token_id = quote.token_id
+    liquidity = quote.liquidity
+    market_id = quote.market_id
+
+    if quote.ratio is None:
+        _price_quotes([quote], config.settings.depth_ratio_margin)
+    ratio = quote.ratio
+    edge_pct = quote.edge_pct
+    book_age_ms = book_age * 1000.0 if book_age is not None else None
+
+    _mark_hot(state, quote, ratio)
+
+    threshold_price = quote.threshold_price
     avail_shares_at_th = avail_usd_at_th = wavg_price_at_th = None
-    if token_id:
-        book = await fetch_order_book(token_id)
+    if token_id and quote.needs_depth:
         if book:
             s, u, w = summarize_liquidity_to_price(book, threshold_price)
             avail_shares_at_th, avail_usd_at_th, wavg_price_at_th = s, u, w
@@ -378,6 +862,17 @@ async def _evaluate_opportunity(
             avail_shares_at_th = 0.0
             avail_usd_at_th = 0.0
 
+    if state.odds_table is not None:
+        state.odds_table.write_evaluation(
+            pin_event_id,
+            quote.pin_outcome,
+            token_id,
+            o_pin,
+            polymarket_price,
+            book.best_ask if book else None,
+            avail_usd_at_th,
+        )
+
     log_opportunity_change(
         mkey=pin_title or str(pin_event_id),
         okey=outcome_label,
@@ -394,13 +889,45 @@ async def _evaluate_opportunity(
         avail_shares_at_th=avail_shares_at_th,
         avail_usd_at_th=avail_usd_at_th,
         wavg_price_at_th=wavg_price_at_th,
+        book_age_ms=book_age_ms,
     )
 
     if not (ratio and ratio >= config.ARB_RATIO):
-        return
+        return None
+    return TradeIntent(
+        quote=quote,
+        cooldown_key=token_id or f"{market_id}:{outcome_label}",
+        avail_shares_at_th=avail_shares_at_th,
+        avail_usd_at_th=avail_usd_at_th,
+        wavg_price_at_th=wavg_price_at_th,
+        book_age_ms=book_age_ms,
+    )
+
 
-    cooldown_key = token_id or f"{market_id}:{outcome_label}"
-    if not check_trade_cooldown(state, cooldown_key, polymarket_price):
+async def execute_trade_intents(state: BotState, intents: Sequence[TradeIntent]) -> None:
+    """Apply cooldowns and place orders for ``intents`` one at a time, in the given order."""
+    for intent in intents:
+        try:
+            await _execute_trade_intent(state, intent)
+        except Exception as exc:
+            logger.error("Strategy error for %s / %s: %s", intent.quote.pin_event_id, intent.quote.outcome_label, exc)
+
+
+async def _execute_trade_intent(state: BotState, intent: TradeIntent) -> None:
+    quote = intent.quote
+    pin_event_id = quote.pin_event_id
+    pin_title = quote.pin_title
+    pm_event = quote.pm_event
+    outcome_label = quote.outcome_label
+    o_pin = quote.o_pin
+    o_pm = quote.o_pm
+    polymarket_price = quote.polymarket_price
+    token_id = quote.token_id
+    liquidity = quote.liquidity
+    market_id = quote.market_id
+    avail_usd_at_th = intent.avail_usd_at_th
+
+    if not check_trade_cooldown(state, intent.cooldown_key, polymarket_price):
         return
 
     bet_amount = config.settings.bet_amount_usd
@@ -428,22 +955,23 @@ async def _evaluate_opportunity(
         o_pin=o_pin or 0.0,
         p_yes=polymarket_price or 0.0,
         o_pm=o_pm or 0.0,
-        ratio=ratio,
-        edge_pct=edge_pct,
+        ratio=quote.ratio,
+        edge_pct=quote.edge_pct,
         liquidity=liquidity,
         pm_market_id=market_id or "",
         token_id=token_id,
         trigger_type="ARBITRAGE",
         reason="threshold",
-        avail_shares_at_th=avail_shares_at_th,
+        avail_shares_at_th=intent.avail_shares_at_th,
         avail_usd_at_th=avail_usd_at_th,
-        wavg_price_at_th=wavg_price_at_th,
+        wavg_price_at_th=intent.wavg_price_at_th,
+        book_age_ms=intent.book_age_ms,
     )
 
     trade_details = {
         "timestamp_utc": time.time(),
         "pinnacle_match_id": pin_event_id,
-        "polymarket_event_id": pm_event.get("id"),
+        "polymarket_event_id": pm_event.event_id,
         "polymarket_market_id": market_id,
         "polymarket_token_id": token_id,
         "match_title": pin_title,
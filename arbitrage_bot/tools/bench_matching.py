@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark Pinnacle ↔ Polymarket title matching: brute-force thefuzz vs ``MatchIndex``.
+
+Titles are synthetic team names. Polymarket titles use ``vs.``, some Pinnacle titles
+add or drop a club suffix, abbreviate or misspell a word, and a share of matches have
+no Polymarket counterpart. The ``baseline`` row is the old behaviour: every Pinnacle
+title scored against every event with ``thefuzz.fuzz.token_sort_ratio``. The index
+result is checked against it match by match.
+
+    python arbitrage_bot/tools/bench_matching.py --titles 1000 [--no-numpy]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from thefuzz import fuzz  # noqa: E402
+
+from arbitrage_bot import matching  # noqa: E402
+from arbitrage_bot.records import PolymarketEvent  # noqa: E402
+
+_SYLLABLES = ("ar", "be", "ca", "do", "el", "fi", "go", "ha", "in", "ju", "ko", "lu", "ma", "ne", "or", "pa", "ri", "sa", "to", "ve")
+_SUFFIXES = ("City", "United", "Rovers", "Athletic", "FC", "Town", "Wanderers", "")
+
+
+def _team(rng: random.Random) -> str:
+    name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    suffix = rng.choice(_SUFFIXES)
+    return f"{name} {suffix}".strip()
+
+
+def _variant(rng: random.Random, team: str) -> str:
+    words = team.split()
+    roll = rng.random()
+    if roll < 0.15 and len(words) > 1:
+        return words[0]
+    if roll < 0.25 and len(words[0]) > 4:
+        position = rng.randrange(1, len(words[0]) - 1)
+        words[0] = words[0][:position] + words[0][position + 1 :]
+    elif roll < 0.35:
+        words.append("FC")
+    return " ".join(words)
+
+
+def synthetic_titles(count: int, unmatched: float, seed: int) -> tuple:
+    rng = random.Random(seed)
+    events = []
+    pins = {}
+    for index in range(count):
+        home, away = _team(rng), _team(rng)
+        events.append(PolymarketEvent(event_id=str(index), title=f"{home} vs. {away}", markets=()))
+        if rng.random() < unmatched:
+            home, away = _team(rng), _team(rng)
+        pins[f"pin{index}"] = f"{_variant(rng, home)} vs {_variant(rng, away)}"
+    return events, pins
+
+
+def brute_force(pins: dict, events: list) -> dict:
+    results = {}
+    for match_id, pin_title in pins.items():
+        best_id, best_score = None, 0
+        for event in events:
+            score = fuzz.token_sort_ratio(matching.normalize_title(pin_title), matching.normalize_title(event.title))
+            if score > best_score:
+                best_id, best_score = event.event_id, score
+        results[match_id] = (best_id, best_score)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark title matching.")
+    parser.add_argument("--titles", type=int, default=1000, help="Pinnacle titles and Polymarket events each")
+    parser.add_argument("--unmatched", type=float, default=0.2, help="Share of Pinnacle titles without a counterpart")
+    parser.add_argument("--threshold", type=int, default=70, help="Score a pairing needs to count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-numpy", action="store_true", help="Score pair by pair as without numpy installed")
+    args = parser.parse_args()
+    if args.no_numpy:
+        matching.np = None
+
+    events, pins = synthetic_titles(args.titles, args.unmatched, args.seed)
+    print(f"{len(pins)} Pinnacle titles x {len(events)} Polymarket events; numpy batch scoring: {matching.np is not None}")
+
+    started = time.perf_counter()
+    expected = brute_force(pins, events)
+    baseline = time.perf_counter() - started
+    print(f"baseline  {baseline * 1000:>9.1f} ms   {len(pins) * len(events):>10,} comparisons")
+
+    index = matching.MatchIndex()
+    started = time.perf_counter()
+    index.sync({event.event_id: event for event in events})
+    indexed = time.perf_counter() - started
+    started = time.perf_counter()
+    index.resolve(pins)
+    resolved = time.perf_counter() - started
+    print(f"index     {resolved * 1000:>9.1f} ms   {index.comparisons:>10,} comparisons   ({indexed * 1000:.1f} ms to index events)")
+
+    differ = sum(index.best_candidate(match_id, title) != expected[match_id] for match_id, title in pins.items())
+    paired = sum(score >= args.threshold for _, score in expected.values())
+    print(f"{paired} titles pair at >= {args.threshold}; best event/score differing from baseline: {differ}")
+    return 1 if differ else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
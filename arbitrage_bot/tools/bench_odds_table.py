@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: shared-memory odds table vs pickled queue transfer between processes.
+
+The writer (this process) applies ``--updates`` odds updates over ``--rows`` (match,
+outcome) rows; a reader process consumes them:
+
+* ``table``: the writer updates ``OddsTable`` rows in place; the reader attaches to the
+  segment and reads rows with seqlock retries. Each write stores the same value in both
+  book fields, so the reader also counts torn reads (fields from different writes).
+* ``queue rows``: each update is a tuple sent through ``multiprocessing.Queue`` in
+  batches of ``--batch``, applied by the reader into a dict.
+* ``queue records``: like ``queue rows`` but with the full ``PinnacleMatch`` and
+  ``PolymarketEvent`` records, as strategy workers receive them today.
+
+    python arbitrage_bot/tools/bench_odds_table.py --rows 5000 --updates 200000
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from arbitrage_bot.odds_table import OddsTable  # noqa: E402
+from arbitrage_bot.records import PinnacleMatch, PolymarketEvent, PolymarketMarket  # noqa: E402
+
+
+def _keys(rows: int) -> list:
+    return [(f"pin{index // 2}", "home" if index % 2 == 0 else "away") for index in range(rows)]
+
+
+def _records(index: int, price: float) -> tuple:
+    match = PinnacleMatch.from_frame(
+        {"MatchId": f"pin{index}", "homeName": f"Home{index}", "awayName": f"Away{index}",
+         "Periods": [{"Win1x2": {"Win1": {"value": 1 / price}, "Win2": {"value": 1 / (1 - price)}}}]}
+    )
+    market = PolymarketMarket(
+        market_id=f"m{index}", question_lower=f"home{index} vs. away{index}", group_item_title_lower="",
+        sports_market_type="moneyline", outcomes=(f"Home{index}", f"Away{index}"), prices=(price, 1 - price),
+        token_ids=(f"{index:078d}", f"{index + 1:078d}"), active=True, closed=False, enable_order_book=True,
+        liquidity=500.0, well_formed=True,
+    )
+    event = PolymarketEvent(event_id=str(index), title=f"Home{index} vs. Away{index}", markets=(market,))
+    return match, event
+
+
+def table_reader(name: str, rows: int, stop, result) -> None:
+    table = OddsTable.attach(name)
+    keys = _keys(rows)
+    located = [table.find(*key) for key in keys]
+    reads = torn = 0
+    started = time.perf_counter()
+    while not stop.is_set():
+        for row in located:
+            odds = table.read(row)
+            if odds.best_ask != odds.depth_usd:
+                torn += 1
+        reads += len(located)
+    elapsed = time.perf_counter() - started
+    result.put((reads, elapsed, torn, table.retries))
+    table.close()
+
+
+def queue_reader(inbox, result) -> None:
+    latest = {}
+    applied = 0
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        for update in batch:
+            latest[update[0]] = update
+        applied += len(batch)
+    result.put(applied)
+
+
+def bench_table(args, context) -> None:
+    table = OddsTable.create(args.rows)
+    keys = _keys(args.rows)
+    for index, (match_id, outcome) in enumerate(keys):
+        table.write_evaluation(match_id, outcome, f"{index:078d}", 2.0, 0.5, 0.0, 0.0)
+    stop, result = context.Event(), context.Queue()
+    reader = context.Process(target=table_reader, args=(table.name, args.rows, stop, result))
+    reader.start()
+    time.sleep(1.0)
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    for update in range(args.updates):
+        index = rng.randrange(args.rows)
+        match_id, outcome = keys[index]
+        value = float(update)
+        table.write_pinnacle(match_id, outcome, 1.5 + (update % 100) / 100)
+        table.write_evaluation(match_id, outcome, f"{index:078d}", 1.5 + (update % 100) / 100, 0.4, value, value)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    reads, read_elapsed, torn, retries = result.get()
+    reader.join()
+    table.close()
+    print(f"table          write {elapsed / args.updates * 1e6:6.2f} µs/update   read {read_elapsed / max(reads, 1) * 1e6:6.2f} µs/row"
+          f"   {args.updates / elapsed:>10,.0f} updates/s   reads {reads:,}  retries {retries:,}  torn {torn}")
+
+
+def bench_queue(args, context, records: bool) -> None:
+    inbox, result = context.Queue(), context.Queue()
+    reader = context.Process(target=queue_reader, args=(inbox, result))
+    reader.start()
+    rng = random.Random(args.seed)
+    keys = _keys(args.rows)
+    payloads = [_records(index, 0.4) for index in range(args.rows // 2)] if records else None
+    started = time.perf_counter()
+    batch = []
+    for update in range(args.updates):
+        index = rng.randrange(args.rows)
+        if records:
+            batch.append((index, *payloads[index // 2]))
+        else:
+            batch.append((index, *keys[index], 1.5 + (update % 100) / 100, 0.4, float(update), float(update)))
+        if len(batch) >= args.batch:
+            inbox.put(batch)
+            batch = []
+    if batch:
+        inbox.put(batch)
+    inbox.put(None)
+    applied = result.get()
+    elapsed = time.perf_counter() - started
+    reader.join()
+    name = "queue records" if records else "queue rows"
+    print(f"{name:<14} transfer {elapsed / applied * 1e6:6.2f} µs/update (pickle, pipe, unpickle, apply)   {applied / elapsed:>10,.0f} updates/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared-memory odds table against pickled queues.")
+    parser.add_argument("--rows", type=int, default=5000, help="(match, outcome) rows")
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=100, help="Updates per queue message")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{args.rows} rows, {args.updates:,} updates")
+    bench_table(args, context)
+    bench_queue(args, context, records=False)
+    bench_queue(args, context, records=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Measure event-loop stalls while orders are signed and posted.
+
+A real ``py_clob_client`` client (throwaway key) submits ``--orders`` BUY orders, one
+after another as ``strategy.execute_trade_intents`` does, to ``stub_clob`` running on
+its own thread with ``--latency-ms`` per request. Each order goes to a new token, so
+the tick-size, neg-risk and fee-rate lookups are not cached, as for a first trade.
+Meanwhile a probe task sleeps ``--probe-ms`` at a time on the bot's loop; how late it
+wakes up is the stall ingestion and the strategy would see.
+
+* ``inline``: ``create_order`` + ``post_order`` called on the loop (the old path);
+* ``executor``: ``trading.submit_order`` on ``ORDER_EXECUTOR``.
+
+    python arbitrage_bot/tools/bench_order_submit.py --orders 20 --latency-ms 20
+"""
+import argparse
+import asyncio
+import base64
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from aiohttp import web  # noqa: E402
+from py_clob_client.client import ClobClient  # noqa: E402
+from py_clob_client.clob_types import ApiCreds, OrderArgs  # noqa: E402
+from py_clob_client.order_builder.constants import BUY  # noqa: E402
+
+from arbitrage_bot import trading  # noqa: E402
+from arbitrage_bot.logging_utils import configure_logging  # noqa: E402
+from arbitrage_bot.metrics import LatencyStats  # noqa: E402
+from arbitrage_bot.tools.stub_clob import make_app  # noqa: E402
+
+_KEY = "0x" + "42" * 32
+
+
+def start_stub(port: int, latency_ms: float) -> None:
+    """Serve ``stub_clob`` from a daemon thread, so a blocked bot loop cannot stall it."""
+    ready = threading.Event()
+
+    def serve() -> None:
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(make_app(latency_ms=latency_ms))
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, name="stub-clob", daemon=True).start()
+    ready.wait()
+
+
+def make_client(port: int) -> ClobClient:
+    secret = base64.urlsafe_b64encode(b"s" * 32).decode()
+    return ClobClient(f"http://127.0.0.1:{port}", key=_KEY, chain_id=137, creds=ApiCreds("key", secret, "pass"))
+
+
+async def probe(interval: float, lag: LatencyStats, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag.observe(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run(mode: str, client: ClobClient, args, offset: int) -> dict:
+    lag, orders = LatencyStats(window=100000), LatencyStats()
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(args.probe_ms / 1000.0, lag, stop))
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    for index in range(args.orders):
+        order_args = OrderArgs(price=0.45, size=10.0, side=BUY, token_id=str(10**20 + offset + index))
+        submitted = time.perf_counter()
+        if mode == "inline":
+            trading._sign_and_post(client, order_args)
+        else:
+            await trading.submit_order(client, order_args)
+        orders.observe(time.perf_counter() - submitted)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+    return {
+        "orders_ms": orders.as_dict(),
+        "lag_ms": lag.as_dict(),
+        "stalled_ms": lag.total_ms,
+        "elapsed_ms": elapsed * 1000.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure event-loop stalls around order submission.")
+    parser.add_argument("--orders", type=int, default=20, help="Orders per mode")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Stub CLOB latency per request")
+    parser.add_argument("--probe-ms", type=float, default=1.0, help="Probe sleep; lateness beyond it is a stall")
+    parser.add_argument("--port", type=int, default=18091)
+    args = parser.parse_args()
+
+    configure_logging("ERROR")
+    start_stub(args.port, args.latency_ms)
+    client = make_client(args.port)
+    print(f"{args.orders} orders per mode, stub latency {args.latency_ms:.0f} ms/request, probe every {args.probe_ms} ms")
+    for offset, mode in enumerate(("inline", "executor")):
+        result = asyncio.run(run(mode, client, args, offset * args.orders))
+        order, lag = result["orders_ms"], result["lag_ms"]
+        print(
+            f"{mode:<9} order avg {order['avg_ms']:6.1f} ms   probe wakeups {lag['count']:>6,}   stall p99 {lag['p99_ms']:7.2f} ms"
+            f"  max {lag['max_ms']:7.1f} ms   stalled {result['stalled_ms']:6.0f} of {result['elapsed_ms']:.0f} ms"
+        )
+    trading.close_order_executor()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
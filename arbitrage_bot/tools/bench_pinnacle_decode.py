@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark Pinnacle frame decoders: frames/sec and bytes retained per match.
+
+Frames are synthetic ``shared.GameData`` payloads shaped like the Go parser's output
+(``Raw`` blobs, several periods with ``Games``/``Totals``/``Handicap``/team-total maps).
+The ``baseline`` row is the old behaviour: ``json.loads`` keeping the whole dict.
+
+    python arbitrage_bot/tools/bench_pinnacle_decode.py --frames 5000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from arbitrage_bot import pinnacle_frames  # noqa: E402
+
+
+def _odd(rng: random.Random) -> dict:
+    value = round(rng.uniform(1.05, 12.0), 3)
+    return {"value": value, "raw": {"price": value, "american": int(value * 100), "max": 5000, "lineId": rng.getrandbits(40)}}
+
+
+def _lines(rng: random.Random, keys: tuple, count: int) -> dict:
+    return {f"{rng.uniform(-10, 250):.1f}": {key: _odd(rng) for key in keys} for _ in range(count)}
+
+
+def synthetic_frame(rng: random.Random, index: int) -> str:
+    periods = []
+    for _ in range(3):
+        periods.append(
+            {
+                "Win1x2": {"Win1": _odd(rng), "WinNone": _odd(rng), "Win2": _odd(rng)},
+                "Games": _lines(rng, ("Win1", "WinNone", "Win2"), 2),
+                "Totals": _lines(rng, ("WinMore", "WinLess"), 8),
+                "Handicap": _lines(rng, ("Win1", "Win2"), 8),
+                "FirstTeamTotals": _lines(rng, ("WinMore", "WinLess"), 3),
+                "SecondTeamTotals": _lines(rng, ("WinMore", "WinLess"), 3),
+            }
+        )
+    frame = {
+        "Pid": 1_500_000_000 + index,
+        "LeagueName": "Synthetic League",
+        "homeName": f"Home Team {index}",
+        "awayName": f"Away Team {index}",
+        "MatchId": f"{index:08d}",
+        "isLive": True,
+        "HomeScore": float(rng.randint(0, 5)),
+        "AwayScore": float(rng.randint(0, 5)),
+        "Periods": periods,
+        "Source": "Pinnacle",
+        "SportName": "Soccer",
+        "CreatedAt": "2024-01-01T00:00:00Z",
+        "Raw": {"matchup": {"id": index, "participants": [{"name": "x" * 40, "alignment": side} for side in ("home", "away")]},
+                "markets": [{"key": f"s;0;m;{i}", "prices": [{"price": rng.randint(-300, 300)} for _ in range(3)]} for i in range(20)]},
+    }
+    return json.dumps(frame)
+
+
+def deep_size(obj, seen=None) -> int:
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+
+def bench(name: str, decode, frames: list, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for frame in frames:
+            decode(frame)
+        best = min(best, time.perf_counter() - started)
+    sample = [decode(frame) for frame in frames[:200]]
+    retained = sum(deep_size(item) for item in sample) / len(sample)
+    print(f"{name:<9} {len(frames) / best:>12,.0f} frames/s   {retained:>10,.0f} bytes/match")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Pinnacle frame decoders.")
+    parser.add_argument("--frames", type=int, default=5000, help="Number of synthetic frames")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per decoder (best is reported)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    frames = [synthetic_frame(rng, i) for i in range(args.frames)]
+    avg_len = sum(len(frame) for frame in frames) / len(frames)
+    print(f"{len(frames)} frames, {avg_len:,.0f} bytes each; selected decoder: {pinnacle_frames.DECODER_NAME}")
+
+    bench("baseline", json.loads, frames, args.repeat)
+    for name, decode in pinnacle_frames.DECODERS.items():
+        bench(name, decode, frames, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
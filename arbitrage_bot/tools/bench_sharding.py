@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Benchmark strategy throughput in-process vs sharded across worker processes.
+
+Synthetic live matches are paired with Polymarket moneyline events; order books come
+from an in-memory stub, approvals are bypassed and opportunity rows go to a temporary
+file, so the run is offline. The main process plays ingestion: it re-prices a share of
+the matches every ``--interval`` and marks them dirty, as the Pinnacle handler does.
+Throughput is the number of outcomes the strategy got through per second; the
+``0 workers`` row is the default single-loop mode.
+
+    python arbitrage_bot/tools/bench_sharding.py --matches 2000 --workers 0 1 2 4 8
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from arbitrage_bot import config, data_sources, matching, orderbook, sharding, strategy  # noqa: E402
+from arbitrage_bot.logging_utils import configure_logging  # noqa: E402
+from arbitrage_bot.records import PinnacleMatch  # noqa: E402
+from arbitrage_bot.state import BotState  # noqa: E402
+
+_BOOK = orderbook.ParsedBook([(0.30, 100.0)], [(0.50, 50.0), (0.60, 80.0)], book_hash="stub")
+
+
+class StubBooks:
+    """Book source serving one fixed book for every token."""
+
+    def watch(self, token_ids) -> None:
+        pass
+
+    def get(self, token_id):
+        return _BOOK
+
+    def age(self, token_id):
+        return 0.0
+
+    def version(self, token_id):
+        return ("stub",)
+
+    def stats(self) -> dict:
+        return {}
+
+
+def offline(log_path: str) -> None:
+    """Run in every process: stub books, approve every pair, write rows to ``log_path``."""
+    configure_logging("ERROR")
+    orderbook.attach_book_source(StubBooks())
+    matching.match_approver.is_approved = lambda candidate: True
+    config.OPPORTUNITY_LOG_FILE = Path(log_path)
+
+
+def synthetic_events(count: int, rng: random.Random) -> dict:
+    events = {}
+    for index in range(count):
+        p_home = round(rng.uniform(0.2, 0.7), 3)
+        events[str(index)] = data_sources.lean_event(
+            {
+                "id": str(index),
+                "title": f"Home{index} City vs. Away{index} United",
+                "live": True,
+                "active": True,
+                "closed": False,
+                "markets": [
+                    {
+                        "id": f"m{index}",
+                        "question": f"Home{index} City vs. Away{index} United",
+                        "sportsMarketType": "moneyline",
+                        "outcomes": json.dumps([f"Home{index} City", f"Away{index} United"]),
+                        "outcomePrices": json.dumps([str(p_home), str(round(1.02 - p_home, 3))]),
+                        "clobTokenIds": json.dumps([f"h{index}", f"a{index}"]),
+                        "active": True,
+                        "closed": False,
+                        "enableOrderBook": True,
+                        "liquidityNum": 500.0,
+                    }
+                ],
+            }
+        )
+    return events
+
+
+def reprice(state: BotState, index: int, rng: random.Random, sports: int) -> None:
+    home, away = f"Home{index} City", f"Away{index} United"
+    odds = {"Win1": {"value": round(rng.uniform(1.4, 3.5), 3)}, "Win2": {"value": round(rng.uniform(1.4, 3.5), 3)}}
+    frame = {"MatchId": f"pin{index}", "homeName": home, "awayName": away, "SportName": f"sport{index % sports}",
+             "Periods": [{"Win1x2": odds}]}
+    kind = "update" if frame["MatchId"] in state.pinnacle_data else "add"
+    state.pinnacle_data[frame["MatchId"]] = PinnacleMatch.from_frame(frame)
+    state.mark_dirty("pinnacle", frame["MatchId"], kind)
+
+
+def _processed(stats: dict) -> int:
+    return stats.get("evaluated", 0) + stats.get("skipped", 0)
+
+
+async def run(workers: int, args, log_path: str) -> dict:
+    rng = random.Random(args.seed)
+    state = BotState()
+    data_sources.apply_polymarket_events(state, synthetic_events(args.matches, rng))
+    for index in range(args.matches):
+        reprice(state, index, rng, args.sports)
+
+    if workers:
+        runner = sharding.run_sharded_strategy(
+            state, workers, args.shard_by, initializer=functools.partial(offline, log_path)
+        )
+        processed = lambda: sum(_processed(report.get("evaluation_memo", {})) for report in state.strategy_metrics.get("shards", {}).values())  # noqa: E731
+    else:
+        runner = strategy.run_strategy(state)
+        processed = lambda: _processed(strategy.EVALUATION_MEMO.stats())  # noqa: E731
+    task = asyncio.create_task(runner)
+
+    # Let every worker start, index its events and evaluate the initial matches.
+    deadline = time.monotonic() + 120
+    while processed() < args.matches * 2 and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(2 * sharding._REPORT_INTERVAL_SEC)
+    started, before = time.monotonic(), processed()
+    batch = max(1, int(args.matches * args.share))
+    while time.monotonic() - started < args.seconds:
+        for index in rng.sample(range(args.matches), batch):
+            reprice(state, index, rng, args.sports)
+        await asyncio.sleep(args.interval)
+    # Reports lag by up to one interval; wait for them before reading the counters.
+    await asyncio.sleep(2 * sharding._REPORT_INTERVAL_SEC)
+    elapsed = time.monotonic() - started
+    done = processed() - before
+    latencies = [
+        report.get("dirty_to_eval_ms_avg")
+        for report in (state.strategy_metrics.get("shards", {}).values() if workers else [state.strategy_metrics])
+    ]
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    latencies = [value for value in latencies if value is not None]
+    return {"per_sec": done / elapsed, "latency_ms": sum(latencies) / len(latencies) if latencies else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded strategy throughput.")
+    parser.add_argument("--matches", type=int, default=2000, help="Live matches (and Polymarket events)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, 8], help="Worker counts; 0 = in-process")
+    parser.add_argument("--shard-by", choices=("match", "sport"), default="match")
+    parser.add_argument("--sports", type=int, default=12, help="Distinct sports in the synthetic load")
+    parser.add_argument("--share", type=float, default=0.25, help="Share of matches re-priced per interval")
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between re-pricing rounds")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measured duration per run")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    offered = args.matches * args.share * 2 / args.interval
+    print(f"{args.matches} matches, ~{offered:,.0f} outcome updates/s offered, {os.cpu_count()} CPUs, shard by {args.shard_by}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            log_path = str(Path(tmp) / f"opportunities_{workers}.csv")
+            offline(log_path)
+            strategy.EVALUATION_MEMO = strategy.EvaluationMemo()
+            result = asyncio.run(run(workers, args, log_path))
+            latency = f"{result['latency_ms']:.1f} ms" if result["latency_ms"] is not None else "n/a"
+            print(f"{workers} workers  {result['per_sec']:>10,.0f} outcomes/s   dirty→evaluated avg {latency}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Check how many ``GET /book`` requests ``orderbook`` spends per fetch.
+
+Runs ``stub_clob`` in-process, accepting only ``--param`` on ``GET /book`` and with
+one token that has no book, and fetches through ``orderbook._fetch_uncached`` (the
+fan-out path of ``fetch_order_books``):
+
+* the first fetch probes ``BOOK_QUERY_PARAMS`` until the stub's parameter works;
+* after that, a known token costs exactly one request;
+* so does the token without a book: its 404 means "no book", not "wrong parameter".
+
+    python arbitrage_bot/tools/check_book_params.py --param market
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from aiohttp import web  # noqa: E402
+
+from arbitrage_bot.tools.stub_clob import make_app  # noqa: E402
+
+_MISSING = "no-book-token"
+
+
+async def run(args) -> int:
+    app = make_app(param=args.param, missing=frozenset({_MISSING}))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    counters = app["counters"]
+
+    from arbitrage_bot import orderbook
+
+    failures = 0
+
+    async def check(label: str, token_id: str, expect_book: bool, max_requests: int) -> None:
+        nonlocal failures
+        before = counters["book_requests"]
+        book = await orderbook._fetch_uncached(token_id)
+        requests = counters["book_requests"] - before
+        ok = (book is not None) == expect_book and requests <= max_requests
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {label:<24} book={'yes' if book is not None else 'no ':<3} requests={requests}")
+
+    try:
+        await check("first fetch (learning)", "token-1", True, len(orderbook.BOOK_QUERY_PARAMS))
+        await check("known token", "token-2", True, 1)
+        for attempt in range(3):
+            await check(f"token without book #{attempt + 1}", _MISSING, False, 1)
+        await check("known token again", "token-3", True, 1)
+        print(f"book_params: {orderbook.http_stats()['book_params']}")
+    finally:
+        await orderbook.close_http_client()
+        await runner.cleanup()
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check GET /book requests per fetch against stub_clob.")
+    parser.add_argument("--param", default="market", help="Only query parameter the stub accepts")
+    parser.add_argument("--port", type=int, default=18092)
+    args = parser.parse_args()
+    # Settings are read at import time, so point the client at the stub first.
+    os.environ["CLOB_API_URL"] = f"http://127.0.0.1:{args.port}"
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
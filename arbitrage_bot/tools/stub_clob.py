@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Polymarket CLOB REST API and market websocket.
+
+Serves deterministic synthetic order books (``GET /book`` and the multi-book
+``POST /books``) and streams them over ``/ws/market`` (``book`` snapshots on
+subscribe, then ``price_change`` deltas), so the bot's order-book paths can be
+exercised offline:
+
+    python arbitrage_bot/tools/stub_clob.py --port 18080 --param market
+    CLOB_API_URL=http://127.0.0.1:18080 python -m arbitrage_bot.main
+    CLOB_API_URL=http://127.0.0.1:18080 CLOB_WS_URL=ws://127.0.0.1:18080/ws/market \\
+        BOOK_SOURCE=stream python -m arbitrage_bot.main
+
+``--ws-gap-every N`` silently drops every Nth delta to exercise the client's
+resync path. Tokens listed with ``--missing`` have no book: ``GET /book`` answers
+404 as the real CLOB does and ``POST /books`` leaves them out. ``GET /tick-size``, ``/neg-risk``, ``/fee-rate`` and ``POST /order``
+answer ``py_clob_client`` order submission (orders are accepted, never matched).
+``GET /stats`` returns request counters, ``POST /stats/reset`` clears them.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+
+from aiohttp import WSMsgType, web
+
+
+def synthetic_book(token_id: str, levels: int = 5) -> dict:
+    seed = int(hashlib.sha1(token_id.encode()).hexdigest()[:8], 16)
+    mid = 0.2 + (seed % 600) / 1000.0
+    asks = []
+    bids = []
+    for i in range(levels):
+        size = 50 + (seed >> i) % 200
+        asks.append({"price": f"{min(0.999, mid + 0.01 * (i + 1)):.3f}", "size": f"{size:.2f}"})
+        bids.append({"price": f"{max(0.001, mid - 0.01 * (i + 1)):.3f}", "size": f"{size:.2f}"})
+    # The real CLOB lists asks high→low and bids low→high.
+    asks.reverse()
+    bids.reverse()
+    return {
+        "market": f"0x{seed:08x}",
+        "asset_id": token_id,
+        "hash": hashlib.sha1(f"{token_id}:{mid}".encode()).hexdigest(),
+        "timestamp": "0",
+        "bids": bids,
+        "asks": asks,
+    }
+
+
+class BookStore:
+    """Mutable books shared by the REST and websocket endpoints."""
+
+    def __init__(self) -> None:
+        self.books = {}
+        self.timestamp_ms = int(time.time() * 1000)
+
+    def _levels(self, token_id: str) -> dict:
+        if token_id not in self.books:
+            raw = synthetic_book(token_id)
+            self.books[token_id] = {
+                "BUY": {level["price"]: level["size"] for level in raw["bids"]},
+                "SELL": {level["price"]: level["size"] for level in raw["asks"]},
+            }
+        return self.books[token_id]
+
+    def tick(self) -> str:
+        self.timestamp_ms += 1
+        return str(self.timestamp_ms)
+
+    def snapshot(self, token_id: str) -> dict:
+        levels = self._levels(token_id)
+        bids = sorted(levels["BUY"].items(), key=lambda item: float(item[0]))
+        asks = sorted(levels["SELL"].items(), key=lambda item: float(item[0]), reverse=True)
+        return {
+            "event_type": "book",
+            "market": synthetic_book(token_id)["market"],
+            "asset_id": token_id,
+            "hash": hashlib.sha1(json.dumps([bids, asks]).encode()).hexdigest(),
+            "timestamp": self.tick(),
+            "bids": [{"price": price, "size": size} for price, size in bids],
+            "asks": [{"price": price, "size": size} for price, size in asks],
+        }
+
+    def best(self, token_id: str) -> tuple:
+        levels = self._levels(token_id)
+        best_bid = max((float(price) for price in levels["BUY"]), default=0.0)
+        best_ask = min((float(price) for price in levels["SELL"]), default=1.0)
+        return best_bid, best_ask
+
+    def mutate(self, token_id: str, rng: random.Random) -> dict:
+        """Change one level near the top of the book and return the matching delta."""
+        levels = self._levels(token_id)
+        side = rng.choice(("BUY", "SELL"))
+        best_bid, best_ask = self.best(token_id)
+        if side == "BUY":
+            price = min(round(best_bid + rng.choice((-0.01, 0.0, 0.01)), 3), round(best_ask - 0.001, 3))
+        else:
+            price = max(round(best_ask + rng.choice((-0.01, 0.0, 0.01)), 3), round(best_bid + 0.001, 3))
+        key = f"{min(0.999, max(0.001, price)):.3f}"
+        size = 0 if rng.random() < 0.25 and key in levels[side] else rng.randint(10, 400)
+        if size:
+            levels[side][key] = f"{size:.2f}"
+        else:
+            levels[side].pop(key, None)
+        best_bid, best_ask = self.best(token_id)
+        return {
+            "asset_id": token_id,
+            "price": key,
+            "size": f"{size:.2f}",
+            "side": side,
+            "best_bid": f"{best_bid:.3f}",
+            "best_ask": f"{best_ask:.3f}",
+        }
+
+
+def make_app(
+    *,
+    param: str = "token_id",
+    latency_ms: float = 0.0,
+    multi_book: bool = True,
+    ws_interval: float = 0.05,
+    ws_gap_every: int = 0,
+    missing: frozenset = frozenset(),
+    seed: int = 7,
+) -> web.Application:
+    app = web.Application()
+    counters: Counter = Counter()
+    store = BookStore()
+    app["counters"] = counters
+    app["store"] = store
+
+    async def delay() -> None:
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000.0)
+
+    async def book(request: web.Request) -> web.Response:
+        counters["book_requests"] += 1
+        await delay()
+        token_id = request.query.get(param)
+        if not token_id:
+            counters["book_rejected"] += 1
+            return web.json_response({"error": f"missing {param}"}, status=400)
+        if token_id in missing:
+            counters["book_missing"] += 1
+            return web.json_response({"error": "No orderbook exists for the requested token id"}, status=404)
+        return web.json_response(store.snapshot(token_id))
+
+    async def books(request: web.Request) -> web.Response:
+        counters["books_requests"] += 1
+        await delay()
+        if not multi_book:
+            return web.json_response({"error": "not found"}, status=404)
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "invalid body"}, status=400)
+        token_ids = [item.get("token_id") for item in body if isinstance(item, dict) and item.get("token_id")]
+        counters["books_tokens"] += len(token_ids)
+        return web.json_response([store.snapshot(token_id) for token_id in token_ids if token_id not in missing])
+
+    async def market_ws(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        counters["ws_connections"] += 1
+        subscribed = []
+        rng = random.Random(seed)
+
+        async def publish() -> None:
+            sent = 0
+            while not ws.closed:
+                await asyncio.sleep(ws_interval)
+                if not subscribed:
+                    continue
+                token_id = rng.choice(subscribed)
+                change = store.mutate(token_id, rng)
+                sent += 1
+                if ws_gap_every and sent % ws_gap_every == 0:
+                    counters["ws_deltas_dropped"] += 1
+                    continue
+                counters["ws_deltas"] += 1
+                await ws.send_json(
+                    {
+                        "event_type": "price_change",
+                        "market": synthetic_book(token_id)["market"],
+                        "timestamp": store.tick(),
+                        "price_changes": [change],
+                    }
+                )
+
+        publisher = asyncio.create_task(publish())
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                if msg.data == "PING":
+                    await ws.send_str("PONG")
+                    continue
+                try:
+                    body = json.loads(msg.data)
+                except ValueError:
+                    continue
+                assets = [str(asset) for asset in body.get("assets_ids") or []]
+                if body.get("operation") == "unsubscribe":
+                    subscribed[:] = [asset for asset in subscribed if asset not in assets]
+                    continue
+                new_assets = [asset for asset in assets if asset not in subscribed]
+                subscribed.extend(new_assets)
+                counters["ws_subscriptions"] += len(new_assets)
+                if new_assets:
+                    await ws.send_json([store.snapshot(asset) for asset in new_assets])
+        finally:
+            publisher.cancel()
+        return ws
+
+    async def market_info(request: web.Request) -> web.Response:
+        counters["market_info_requests"] += 1
+        await delay()
+        return web.json_response(
+            {"/tick-size": {"minimum_tick_size": 0.01}, "/neg-risk": {"neg_risk": False}, "/fee-rate": {"base_fee": 0}}[
+                request.path
+            ]
+        )
+
+    async def order(request: web.Request) -> web.Response:
+        counters["orders"] += 1
+        await delay()
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "invalid body"}, status=400)
+        order_id = hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()
+        return web.json_response({"success": True, "errorMsg": "", "orderID": f"0x{order_id}", "status": "live"})
+
+    async def stats(_: web.Request) -> web.Response:
+        return web.json_response(dict(counters))
+
+    async def reset(_: web.Request) -> web.Response:
+        counters.clear()
+        return web.json_response({"status": "ok"})
+
+    app.router.add_get("/book", book)
+    app.router.add_post("/books", books)
+    app.router.add_get("/ws/market", market_ws)
+    for path in ("/tick-size", "/neg-risk", "/fee-rate"):
+        app.router.add_get(path, market_info)
+    app.router.add_post("/order", order)
+    app.router.add_get("/stats", stats)
+    app.router.add_post("/stats/reset", reset)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Polymarket CLOB API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=18080, help="Port to bind")
+    parser.add_argument("--param", default="token_id", help="Only query parameter accepted by GET /book")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial per-request latency")
+    parser.add_argument("--no-multi-book", action="store_true", help="Answer POST /books with 404")
+    parser.add_argument("--ws-interval", type=float, default=0.05, help="Seconds between streamed deltas")
+    parser.add_argument("--ws-gap-every", type=int, default=0, help="Drop every Nth delta (0 = never)")
+    parser.add_argument("--missing", default="", help="Comma-separated token ids that have no book")
+    args = parser.parse_args()
+
+    app = make_app(
+        param=args.param,
+        latency_ms=args.latency_ms,
+        multi_book=not args.no_multi_book,
+        ws_interval=args.ws_interval,
+        ws_gap_every=args.ws_gap_every,
+        missing=frozenset(filter(None, args.missing.split(","))),
+    )
+    web.run_app(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Print the bot's live odds table from a separate process.
+
+Attaches to the shared-memory segment the bot creates with ``ODDS_TABLE_ROWS`` > 0
+(name from ``ODDS_TABLE_NAME`` or the bot's startup log) and lists the published
+outcomes with the highest ``O_pm / O_pin`` ratio, without touching the bot's loop:
+
+    ODDS_TABLE_ROWS=4096 ODDS_TABLE_NAME=polypin_odds python -m arbitrage_bot.main
+    python arbitrage_bot/tools/watch_odds_table.py polypin_odds --limit 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from arbitrage_bot.odds_table import OddsTable  # noqa: E402
+
+
+def _ratio(row) -> float:
+    if not row.o_pin or not row.p_yes:
+        return 0.0
+    return (1.0 / row.p_yes) / row.o_pin
+
+
+def _fmt(value, spec: str) -> str:
+    return format(value, spec) if value is not None else "-"
+
+
+def show(table: OddsTable, limit: int) -> None:
+    entries = sorted(table.entries(), key=lambda entry: _ratio(entry[2]), reverse=True)
+    print(f"{time.strftime('%H:%M:%S')}  {len(entries)} outcomes, {table.retries} read retries")
+    print(f"{'match':<14} {'outcome':<28} {'o_pin':>7} {'p_yes':>7} {'ratio':>6} {'ask':>6} {'depth$':>8}")
+    for match_id, outcome, row in entries[:limit]:
+        print(
+            f"{match_id[:14]:<14} {outcome[:28]:<28} {_fmt(row.o_pin, '7.3f')} {_fmt(row.p_yes, '7.3f')}"
+            f" {_ratio(row):6.3f} {_fmt(row.best_ask, '6.3f')} {_fmt(row.depth_usd, '8.2f')}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the bot's shared-memory odds table.")
+    parser.add_argument("name", help="Segment name (ODDS_TABLE_NAME)")
+    parser.add_argument("--limit", type=int, default=20, help="Rows to print")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between refreshes")
+    parser.add_argument("--once", action="store_true", help="Print once and exit")
+    args = parser.parse_args()
+
+    table = OddsTable.attach(args.name)
+    try:
+        while True:
+            show(table, args.limit)
+            if args.once:
+                break
+            time.sleep(args.interval)
+            print()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        table.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
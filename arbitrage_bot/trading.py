@@ -5,7 +5,8 @@ import asyncio
 import csv
 import json
 import time
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
 
 from loguru import logger
 from py_clob_client.client import ClobClient
@@ -14,9 +15,15 @@ from py_clob_client.order_builder.constants import BUY
 
 from . import config
 from .logging_utils import ensure_paper_trades_log_headers
+from .metrics import LatencyStats
 from .orderbook import estimate_fill_on_bids, fetch_order_book, get_best_bid_price
 from .state import BotState
 
+# py_clob_client is blocking end to end (tick size / neg-risk / fee lookups, EIP-712 signing,
+# the POST), so orders are signed and posted on these threads instead of the event loop.
+ORDER_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, config.settings.order_workers), thread_name_prefix="clob-order")
+ORDER_LATENCY = LatencyStats()
+
 
 def get_clob_client(state: BotState) -> Optional[ClobClient]:
     if state.clob_client is not None:
@@ -26,7 +33,7 @@ def get_clob_client(state: BotState) -> Optional[ClobClient]:
         logger.error("POLY_PRIVATE_KEY/PRIVATE_KEY is not set. Cannot create Polymarket client.")
         return None
 
-    host = "https://clob.polymarket.com"
+    host = config.settings.clob_api_url
     try:
         signature_type = config.settings.signature_type.strip() if config.settings.signature_type else None
         if signature_type in {"1", "2"}:
@@ -58,6 +65,29 @@ def get_clob_client(state: BotState) -> Optional[ClobClient]:
         return None
 
 
+def _sign_and_post(client: ClobClient, order_args: OrderArgs) -> Any:
+    started = time.perf_counter()
+    try:
+        signed_order = client.create_order(order_args)
+        return client.post_order(signed_order, OrderType.GTC)
+    except Exception:
+        ORDER_LATENCY.errors += 1
+        raise
+    finally:
+        ORDER_LATENCY.observe(time.perf_counter() - started)
+
+
+def submit_order(client: ClobClient, order_args: OrderArgs) -> asyncio.Future:
+    """Sign and post a GTC order on ``ORDER_EXECUTOR``; the future resolves to the CLOB response."""
+    return asyncio.get_running_loop().run_in_executor(ORDER_EXECUTOR, _sign_and_post, client, order_args)
+
+
+def close_order_executor() -> None:
+    """Let orders already signing finish; drop the ones still queued."""
+    ORDER_EXECUTOR.shutdown(wait=True, cancel_futures=True)
+    logger.info("Order executor closed. Stats: %s", ORDER_LATENCY.as_dict())
+
+
 async def save_trade_log(state: BotState, trade_details: dict, pre_trade_history: list[dict]) -> None:
     trade_time = trade_details["timestamp_utc"]
     pinnacle_match_id = trade_details["pinnacle_match_id"]
@@ -109,7 +139,10 @@ async def place_polymarket_trade(state: BotState, trade_details: dict) -> bool:
     logger.success("--- Attempting trade on Polymarket ---")
     logger.info("Trade details: %s", json.dumps(trade_details, default=str))
 
-    client = get_clob_client(state)
+    client = state.clob_client
+    if client is None:
+        # First trade: deriving API credentials is a blocking HTTP round trip.
+        client = await asyncio.get_running_loop().run_in_executor(ORDER_EXECUTOR, get_clob_client, state)
     if not client:
         return False
 
@@ -128,8 +161,7 @@ async def place_polymarket_trade(state: BotState, trade_details: dict) -> bool:
             side=BUY,
             token_id=trade_details["polymarket_token_id"],
         )
-        signed_order = client.create_order(order_args)
-        resp = client.post_order(signed_order, OrderType.GTC)
+        resp = await submit_order(client, order_args)
         logger.success("Polymarket order posted successfully: %s", resp)
         trade_details["trade_status"] = "SUCCESS"
         trade_details["api_response"] = resp
@@ -170,7 +202,7 @@ async def paper_sell_strategy(state: BotState) -> None:
                 continue
             positions: Dict[str, dict] = dict(state.paper_positions)  # type: ignore[attr-defined]
             for token_id, pos in positions.items():
-                book = await fetch_order_book(token_id)
+                book = await fetch_order_book(token_id, max_age=config.settings.paper_book_max_age_sec)
                 if not book:
                     continue
                 entry_price = pos.get("entry_price")
@@ -7,6 +7,7 @@ from dataclasses import asdict
 from aiohttp import web
 from loguru import logger
 
+from . import orderbook
 from .matching import MatchCandidate, match_approver
 from .state import BotState
 
@@ -153,6 +154,15 @@ async def run_web_ui(state: BotState, *, host: str = "127.0.0.1", port: int = 87
         pending.sort(key=lambda item: item.get("score", 0), reverse=True)
         return web.json_response({"pending": pending})
 
+    async def api_metrics(_: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "strategy": dict(state.strategy_metrics),
+                "clob_http": orderbook.http_stats(),
+                "polymarket": dict(state.polymarket_poll_stats),
+            }
+        )
+
     async def api_decide(request: web.Request) -> web.Response:
         key = request.match_info.get("key")
         action = request.match_info.get("action")
@@ -188,6 +198,7 @@ async def run_web_ui(state: BotState, *, host: str = "127.0.0.1", port: int = 87
     app.router.add_get("/", index)
     app.router.add_get("/api/pending", api_pending)
     app.router.add_post("/api/pending/{key}/{action}", api_decide)
+    app.router.add_get("/api/metrics", api_metrics)
 
     runner = web.AppRunner(app)
     await runner.setup()